@@ -1,5 +1,6 @@
 from typing import Callable, Union, Optional, Set
 
+import argparse
 import networkx as nx
 from tqdm import tqdm
 import time
@@ -11,7 +12,8 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from utils.utils import log_experiment, assign_cost_attributes, ceil_division  # noqa
+from utils.utils import ExperimentLogger, assign_cost_attributes, ceil_division  # noqa
+from utils.checkpoint import CHECKPOINT_DIR, SweepCheckpoint, load_checkpoint  # noqa
 from utils.submodular import sub_function1, sub_function2, sub_function3
 
 
@@ -21,7 +23,8 @@ def cost_seeds_greedy(
         cost_type: str,
         sub_function: Callable,
         initial_seed_set: Optional[Set] = None,
-        current_cost: Union[int, float] = 0  # noqa
+        current_cost: Union[int, float] = 0,  # noqa
+        fill_budget: bool = False
 ) -> Set[int]:
     """
         Input:
@@ -30,6 +33,8 @@ def cost_seeds_greedy(
           - sub_function: the submodular function chosen (can be sub_function1, sub_function2, sub_function3)
           - initial_seed_set: seed set iniziale da cui partire
           - current_cost: costo del seed set iniziale.
+          - fill_budget: se True, i nodi che non rientrano nel budget residuo vengono scartati durante la scansione,
+            così si prosegue con il miglior nodo acquistabile invece di interrompere
         Output:
           - S: target set con costo totale <= budget
     """
@@ -61,6 +66,9 @@ def cost_seeds_greedy(
             # Ciclo per scegliere il nodo con lo score migliore
             for v in remaining_nodes:
                 node_cost = G.nodes[v].get(cost_type, 0)
+                # La scansione è già O(n): il filtro sui nodi acquistabili non richiede un indice dedicato
+                if fill_budget and total_cost + node_cost > budget:
+                    continue
 
                 # value rappresenta lo score del nodo da confrontare con gli altri
                 gain = sub_function(S_selected | {v}, G) - current_value
@@ -86,6 +94,21 @@ def cost_seeds_greedy(
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cost Seeds Greedy su facebook_combined.txt")
+    parser.add_argument("--fill_budget", action="store_true",
+                        help="Prosegue con il miglior nodo acquistabile invece di fermarsi al primo troppo costoso")
+    parser.add_argument("--checkpoint_interval", type=int, default=None,
+                        help="Salva i seed set come delta rispetto alla riga precedente, con una lista completa "
+                             "ogni N righe (default: lista completa in ogni riga)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Riprende la sweep dall'ultimo checkpoint, saltando i budget già completati")
+    parser.add_argument("--resume_every", type=int, default=10,
+                        help="Numero di budget tra due salvataggi del checkpoint usato da --resume")
+    args = parser.parse_args()
+
+    # Opzioni che cambiano i risultati: un checkpoint salvato con opzioni diverse non viene ripreso
+    sweep_config = {"fill_budget": args.fill_budget}
+
     G = nx.read_edgelist("../data/facebook_combined.txt", nodetype=int)
 
     G, cost1, cost2, cost3 = assign_cost_attributes(G, use_threshold=False)
@@ -128,33 +151,44 @@ if __name__ == "__main__":
         current_seed_set: Optional[Set[int]] = None
         current_cost = 0
 
-        for budget_k in tqdm(
-                range(min_budget, max_budget + 1, 100),
-                desc=f"Budget loop for {name}",
-                unit="budget"
-        ):
-            start_time = time.time()
-            S = cost_seeds_greedy(G, budget_k, name, sub_function1, current_seed_set, current_cost)
-            end_time = time.time()
-
-            total_cost = sum(cost[v] for v in S)
-            current_seed_set = S
-            current_cost = total_cost
-
-            exec_time = end_time - start_time
-
-            tqdm.write(f"Function: {name} | Budget: {budget_k}")
-            tqdm.write(f"Seed set size: {len(S)}; Total cost: {total_cost}; Time: {exec_time:.2f}s")
-
-            log_experiment(
-                csv_path=f"./logs/{name}_CSG.csv",
-                algorithm_name=algorithm_name,
-                cost_function=cost_function_desc,
-                use_threshold=False,
-                budget=budget_k,
-                seed_set=S,
-                total_cost=total_cost,
-                execution_time=exec_time,
-                G=G,
-                additional_info={"note": f"Running on facebook_combined.txt with {name}"}
-            )
+        csv_path = f"./logs/{name}_CSG.csv"
+        checkpoint_path = os.path.join(CHECKPOINT_DIR, f"{name}_CSG.json")
+        state = load_checkpoint(checkpoint_path, csv_path, sweep_config) if args.resume else None
+        if state is not None:
+            current_seed_set, current_cost = state["seed_set"], state["current_cost"]
+        with ExperimentLogger(csv_path, checkpoint_interval=args.checkpoint_interval) as logger, \
+                SweepCheckpoint(checkpoint_path, logger, sweep_config, args.resume_every) as checkpoint:
+            for budget_k in tqdm(
+                    range(min_budget, max_budget + 1, 100),
+                    desc=f"Budget loop for {name}",
+                    unit="budget"
+            ):
+                if state is not None and budget_k <= state["last_budget"]:
+                    continue
+
+                start_time = time.time()
+                S = cost_seeds_greedy(G, budget_k, name, sub_function1, current_seed_set, current_cost,
+                                      fill_budget=args.fill_budget)
+                end_time = time.time()
+
+                total_cost = sum(cost[v] for v in S)
+                current_seed_set = S
+                current_cost = total_cost
+
+                exec_time = end_time - start_time
+
+                tqdm.write(f"Function: {name} | Budget: {budget_k}")
+                tqdm.write(f"Seed set size: {len(S)}; Total cost: {total_cost}; Time: {exec_time:.2f}s")
+
+                logger.log_experiment(
+                    algorithm_name=algorithm_name,
+                    cost_function=cost_function_desc,
+                    use_threshold=False,
+                    budget=budget_k,
+                    seed_set=S,
+                    total_cost=total_cost,
+                    execution_time=exec_time,
+                    G=G,
+                    additional_info={"note": f"Running on facebook_combined.txt with {name}"}
+                )
+                checkpoint.update(budget_k, S, total_cost)
@@ -0,0 +1,299 @@
+from typing import Callable, Union, Optional, Set, Dict, Any, List
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+
+import networkx as nx
+from tqdm import tqdm
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.utils import ExperimentLogger, assign_cost_attributes, ceil_division  # noqa
+from utils.checkpoint import CHECKPOINT_DIR, SweepCheckpoint, load_checkpoint  # noqa
+from utils.submodular import sub_function1, sub_function2, sub_function3  # noqa
+from utils.communities import load_or_compute_partition  # noqa
+from utils.shared_graph import SharedGraph, SharedGraphView, attach_shared_graph  # noqa
+from algorithms.CSG_new import compute_delta, cost_seeds_greedy  # noqa
+
+# Grafo condiviso dai processi worker (agganciato una sola volta dall'initializer del pool)
+_WORKER_GRAPH: Optional[SharedGraphView] = None
+
+
+def _init_worker(handle) -> None:
+    global _WORKER_GRAPH
+    _WORKER_GRAPH = SharedGraphView(*attach_shared_graph(handle))
+
+
+def _local_greedy(args) -> Set[int]:
+    """Primo round di GreeDi: greedy sul solo shard, con la funzione submodulare valutata su tutto il grafo."""
+    shard, budget, cost_type, sub_function = args
+    return cost_seeds_greedy(_WORKER_GRAPH, budget, cost_type, sub_function, candidates=shard)
+
+
+def partition_nodes(G: nx.Graph, num_shards: int, method: str = "hash",  # noqa
+                    random_state: Optional[int] = 42) -> List[Set[int]]:
+    """
+        Suddivide i nodi di G in num_shards insiemi disgiunti.
+
+        Args:
+            G: Grafo NetworkX
+            num_shards: Numero di shard
+            method: "hash" (nodo -> hash(nodo) % num_shards) oppure "louvain" (le comunità di Louvain
+                vengono assegnate, dalla più grande, allo shard meno carico)
+            random_state: Seed di Louvain
+
+        Returns:
+            Lista di shard (insiemi di nodi), senza shard vuoti
+    """
+    if num_shards < 1:
+        raise ValueError("num_shards deve essere >= 1")
+
+    shards: List[Set[int]] = [set() for _ in range(num_shards)]
+    if method == "hash":
+        for v in G.nodes():
+            shards[hash(v) % num_shards].add(v)
+    elif method == "louvain":
+        partition = load_or_compute_partition(G, random_state=random_state)
+        communities: Dict[int, List[int]] = {}
+        for node, comm_id in partition.items():
+            communities.setdefault(comm_id, []).append(node)
+        for nodes in sorted(communities.values(), key=len, reverse=True):
+            min(shards, key=len).update(nodes)
+    else:
+        raise ValueError(f"Metodo di partizionamento non supportato: {method}")
+
+    return [shard for shard in shards if shard]
+
+
+def seed_set_value(G: nx.Graph, S: Set[int], sub_function: Callable, half_deg: Dict[int, int],  # noqa
+                   degree: Dict[int, int]) -> float:
+    """
+        Valore di sub_function(S, G) accumulato con compute_delta sui soli vicini dei nodi di S, come il
+        current_value di cost_seeds_greedy: O(somma dei gradi di S) invece di O(n * deg).
+    """
+    neighbors_in_S_count: Dict[int, int] = {}
+    value = 0.0
+    for u in S:
+        for w in G.neighbors(u):
+            old_count = neighbors_in_S_count.get(w, 0)
+            value += compute_delta(sub_function, old_count, old_count + 1,
+                                   half_deg[w], degree[w] if sub_function == sub_function3 else None)
+            neighbors_in_S_count[w] = old_count + 1
+    return value
+
+
+class GreeDiSelector:
+    """
+        Versione distribuita a due round (GreeDi) di cost_seeds_greedy, per tutti i budget di una sweep.
+
+        Round 1: ogni shard esegue cost_seeds_greedy in parallelo sui propri nodi con budget
+        proporzionale alla dimensione dello shard, sulla vista del grafo in memoria condivisa
+        (utils.shared_graph.SharedGraphView). Round 2: greedy finale sull'unione delle scelte locali
+        con l'intero budget. Viene restituita la soluzione migliore tra quella finale e le locali.
+
+        Shard, grafo in memoria condivisa e pool di processi vengono creati una sola volta all'ingresso nel
+        context manager e riusati da tutti i budget.
+
+        Uso:
+            with GreeDiSelector(G, "cost1", sub_function1, num_shards=8) as selector:
+                S = selector.query(budget)
+    """
+
+    def __init__(self, G: nx.Graph, cost_type: str, sub_function: Callable, num_shards: int,  # noqa
+                 method: str = "hash", processes: Optional[int] = None):
+        self.G = G
+        self.cost_type = cost_type
+        self.sub_function = sub_function
+        self.method = method
+        self.shards = partition_nodes(G, num_shards, method)
+        self.processes = processes or len(self.shards)
+        self.degree = dict(G.degree())
+        self.half_deg = {v: ceil_division(deg, 2) for v, deg in self.degree.items()}
+        self._shared: Optional[SharedGraph] = None
+        self._pool = None
+
+    def __enter__(self) -> "GreeDiSelector":
+        # Il grafo (CSR e costi) viene pubblicato in memoria condivisa invece di essere copiato in ogni worker
+        self._shared = SharedGraph.from_networkx(self.G, [self.cost_type])
+        self._shared.publish()
+        self._pool = mp.Pool(self.processes, initializer=_init_worker, initargs=(self._shared.handle,))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        if self._shared is not None:
+            self._shared.release()
+            self._shared = None
+
+    def query(self, budget: Union[int, float], run_info: Optional[Dict[str, Any]] = None) -> Set[int]:
+        if self._pool is None:
+            raise RuntimeError("GreeDiSelector va usato come context manager")
+
+        n = self.G.number_of_nodes()
+        tasks = [(shard, budget * len(shard) / n, self.cost_type, self.sub_function) for shard in self.shards]
+
+        start_time = time.time()
+        local_solutions = self._pool.map(_local_greedy, tasks)
+        local_time = time.time() - start_time
+
+        union = set().union(*local_solutions)
+        start_time = time.time()
+        S_final = cost_seeds_greedy(self.G, budget, self.cost_type, self.sub_function, candidates=union)  # noqa
+        merge_time = time.time() - start_time
+
+        best = max([S_final] + local_solutions,
+                   key=lambda S: seed_set_value(self.G, S, self.sub_function, self.half_deg, self.degree))
+
+        if run_info is not None:
+            run_info.update({
+                "mode": "greedi",
+                "partition": self.method,
+                "num_shards": len(self.shards),
+                "shard_sizes": [len(shard) for shard in self.shards],
+                "union_size": len(union),
+                "local_time": local_time,
+                "merge_time": merge_time,
+                "best_is_local": best is not S_final
+            })
+
+        return best
+
+
+def greedi_cost_seeds_greedy(
+        G: nx.Graph,  # noqa
+        budget: Union[int, float],
+        cost_type: str,
+        sub_function: Callable,
+        num_shards: int,
+        method: str = "hash",
+        processes: Optional[int] = None,
+        run_info: Optional[Dict[str, Any]] = None
+) -> Set[int]:
+    """
+        GreeDi per un singolo budget (vedi GreeDiSelector, da usare direttamente per una sweep).
+
+        Input:
+          - G: grafo non orientato (nx.Graph)
+          - budget: somma dei costi del seed set massima totale ammissibile
+          - cost_type: attributo di costo dei nodi
+          - sub_function: funzione submodulare (sub_function1, sub_function2, sub_function3)
+          - num_shards: numero di shard in cui suddividere i nodi
+          - method: partizionamento dei nodi ("hash" o "louvain")
+          - processes: dimensione del pool di processi (default: num_shards)
+          - run_info: dizionario opzionale in cui vengono salvati i metadati dell'esecuzione
+        Output:
+          - S: target set con costo totale <= budget
+    """
+    with GreeDiSelector(G, cost_type, sub_function, num_shards, method, processes) as selector:
+        return selector.query(budget, run_info)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cost Seeds Greedy distribuito (GreeDi) su facebook_combined.txt")
+    parser.add_argument("--num_shards", type=int, default=os.cpu_count(), help="Numero di shard/processi")
+    parser.add_argument("--partition", type=str, choices=["hash", "louvain"], default="hash",
+                        help="Metodo di partizionamento dei nodi")
+    parser.add_argument("--budget_step", type=int, default=100, help="Passo tra i budget della sweep")
+    parser.add_argument("--compare_single", action="store_true",
+                        help="Esegue per ogni budget anche cost_seeds_greedy a singolo processo e ne logga tempo e "
+                             "speedup (raddoppia il costo della sweep)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Riprende la sweep dall'ultimo checkpoint, saltando i budget già completati")
+    parser.add_argument("--resume_every", type=int, default=10,
+                        help="Numero di budget tra due salvataggi del checkpoint usato da --resume")
+    args = parser.parse_args()
+
+    # Opzioni che cambiano i risultati: un checkpoint salvato con opzioni diverse non viene ripreso
+    sweep_config = {"num_shards": args.num_shards, "partition": args.partition, "budget_step": args.budget_step}
+
+    G = nx.read_edgelist("../data/facebook_combined.txt", nodetype=int)
+    G, cost1, cost2, cost3 = assign_cost_attributes(G, use_threshold=False)
+
+    # Configurazioni funzioni di costo e relative descrizioni
+    cost_functions = {
+        "cost1": cost1,
+        "cost2": cost2,
+        "cost3": cost3
+    }
+
+    descriptions = {
+        "cost1": "cost1: ceiling function of degree(v) / 2",
+        "cost2": "cost2: random int in [min(cost1), max(cost1)]",
+        "cost3": "cost3: scaled log10 of betweenness centrality"
+    }
+
+    for name, cost in cost_functions.items():
+        algorithm_name = "CSG-GreeDi"
+        cost_function_desc = descriptions[name]
+
+        # Calcolo range del budget
+        min_budget = int(max(cost.values()))
+        max_budget = int(sum(cost.values()))
+
+        if min_budget > max_budget:
+            print(f"MinBudget > MaxBudget for {name}")
+            min_budget, max_budget = max_budget, min_budget
+
+        if min_budget == max_budget:
+            print(f"MinBudget = MaxBudget for {name}")
+            continue
+
+        tqdm.write(f"\n{name} — budget da {min_budget} a {max_budget}")
+
+        csv_path = f"./logs/{name}_CSG-GreeDi.csv"
+        checkpoint_path = os.path.join(CHECKPOINT_DIR, f"{name}_CSG-GreeDi.json")
+        state = load_checkpoint(checkpoint_path, csv_path, sweep_config) if args.resume else None
+        with ExperimentLogger(csv_path) as logger, \
+                SweepCheckpoint(checkpoint_path, logger, sweep_config, args.resume_every) as checkpoint, \
+                GreeDiSelector(G, name, sub_function1, args.num_shards, args.partition) as selector:
+            for budget_k in tqdm(
+                    range(min_budget, max_budget + 1, args.budget_step),
+                    desc=f"Budget loop for {name}",
+                    unit="budget"
+            ):
+                if state is not None and budget_k <= state["last_budget"]:
+                    continue
+
+                run_info = {}
+                start_time = time.time()
+                S = selector.query(budget_k, run_info=run_info)
+                exec_time = time.time() - start_time
+
+                total_cost = sum(cost[v] for v in S)
+
+                tqdm.write(f"Function: {name} | Budget: {budget_k}")
+                tqdm.write(f"Seed set size: {len(S)}; Total cost: {total_cost}; Time: {exec_time:.2f}s")
+
+                # Riferimento opzionale: esecuzione a singolo processo
+                if args.compare_single:
+                    start_time = time.time()
+                    S_single = cost_seeds_greedy(G, budget_k, name, sub_function1)
+                    single_time = time.time() - start_time
+                    speedup = single_time / exec_time if exec_time > 0 else float("inf")
+                    run_info.update(single_process_time=single_time, single_process_num_seeds=len(S_single),
+                                    speedup=speedup)
+                    tqdm.write(f"Single process: {len(S_single)} seeds in {single_time:.2f}s "
+                               f"(speedup x{speedup:.2f})")
+
+                logger.log_experiment(
+                    algorithm_name=algorithm_name,
+                    cost_function=cost_function_desc,
+                    use_threshold=False,
+                    budget=budget_k,
+                    seed_set=S,
+                    total_cost=total_cost,
+                    execution_time=exec_time,
+                    G=G,
+                    additional_info={
+                        "note": f"Running on facebook_combined.txt with {name}",
+                        **run_info
+                    }
+                )
+                checkpoint.update(budget_k, S, total_cost)
@@ -1,5 +1,9 @@
-from typing import Callable, Union, Optional, Set, Dict
+from typing import Callable, Union, Optional, Set, Dict, Any, List, Tuple
+import argparse
+import bisect
 import heapq
+import math
+import random
 import networkx as nx
 from tqdm import tqdm
 import time
@@ -10,8 +14,10 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from utils.utils import log_experiment, assign_cost_attributes, ceil_division  # noqa
+from utils.utils import ExperimentLogger, assign_cost_attributes, ceil_division  # noqa
+from utils.checkpoint import CHECKPOINT_DIR, SweepCheckpoint, load_checkpoint  # noqa
 from utils.submodular import sub_function1, sub_function2, sub_function3
+from utils.cost_index import AffordableIndex
 
 
 def compute_delta(
@@ -33,13 +39,48 @@ def compute_delta(
     return 0
 
 
+def compute_gain(
+        G: nx.Graph,  # noqa
+        v: int,
+        sub_func: Callable,
+        neighbors_in_S_count: Dict[int, int],  # noqa
+        half_deg: Dict[int, int],
+        degree: Dict[int, int]
+) -> float:
+    """Calcola il guadagno marginale della funzione submodulare aggiungendo v al seed set."""
+    gain = 0.0
+    for w in G.neighbors(v):
+        old_count = neighbors_in_S_count[w]
+        gain += compute_delta(
+            sub_func, old_count, old_count + 1,
+            half_deg[w], degree[w] if sub_func == sub_function3 else None
+        )
+    return gain
+
+
+def stochastic_sample_size(n: int, budget: Union[int, float], mean_cost: float, sample_epsilon: float) -> int:
+    """
+        Dimensione del campione di candidati per lo stochastic greedy: s = ceil((n / k) * ln(1 / eps)),
+        dove k è il numero atteso di seed stimato come budget / costo medio dei nodi.
+    """
+    if not 0 < sample_epsilon < 1:
+        raise ValueError("sample_epsilon deve essere in (0, 1)")
+    k = max(1, int(budget / mean_cost)) if mean_cost > 0 else max(1, n)
+    return max(1, min(n, math.ceil(n / k * math.log(1 / sample_epsilon))))
+
+
 def cost_seeds_greedy(
         G: nx.Graph,  # noqa
         budget: Union[int, float],
         cost_type: str,
         sub_function: Callable,
         initial_seed_set: Optional[Set] = None,
-        current_cost: Union[int, float] = 0  # noqa
+        current_cost: Union[int, float] = 0,  # noqa
+        sample_epsilon: Optional[float] = None,
+        random_state: Optional[int] = None,
+        run_info: Optional[Dict[str, Any]] = None,
+        fill_budget: bool = False,
+        candidates: Optional[Set[int]] = None
 ) -> Set[int]:
     """
         Input:
@@ -49,6 +90,14 @@ def cost_seeds_greedy(
           - sub_function: the submodular function chosen (can be sub_function1, sub_function2, sub_function3)
           - initial_seed_set: seed set iniziale da cui partire
           - current_cost: costo del seed set iniziale.
+          - sample_epsilon: se specificato, attiva lo stochastic greedy: ad ogni passo viene valutato solo
+            un campione casuale di candidati la cui dimensione dipende da eps (eps più piccolo = campione più grande)
+          - random_state: seed del generatore casuale usato per il campionamento (riproducibilità)
+          - run_info: dizionario opzionale in cui vengono salvati i metadati dell'esecuzione
+          - fill_budget: se True, quando il nodo migliore non rientra nel budget residuo si prosegue con il
+            miglior nodo ancora acquistabile (indice per costo, O(log n)) invece di interrompere
+          - candidates: se specificato, restringe la selezione a questo sottoinsieme di nodi
+            (la funzione submodulare resta valutata sull'intero grafo)
         Output:
           - S: target set con costo totale <= budget
 
@@ -82,36 +131,52 @@ def cost_seeds_greedy(
     else:
         S_selected = set()
 
-    remaining_nodes = set(G.nodes) - S_selected
-    best_value = {}
-    heap = []
+    remaining_nodes = (set(G.nodes) if candidates is None else set(candidates)) - S_selected
 
-    # Inizializza l'heap
+    if sample_epsilon is not None:
+        if fill_budget:
+            raise ValueError("fill_budget non è supportato in modalità stocastica")
+        return _stochastic_greedy(
+            G, budget, cost_type, sub_function, S_selected, remaining_nodes, total_cost,
+            neighbors_in_S_count, half_deg, degree, sample_epsilon, random_state, run_info
+        )
+
+    best_value = {}
     for v in remaining_nodes:
-        gain = 0.0
-        for w in G.neighbors(v):
-            old_count = neighbors_in_S_count[w]
-            new_count = old_count + 1
-            delta = compute_delta(
-                sub_function, old_count, new_count,
-                half_deg[w], degree[w] if sub_function == sub_function3 else None
-            )
-            gain += delta
+        gain = compute_gain(G, v, sub_function, neighbors_in_S_count, half_deg, degree)
         cost_v = G.nodes[v].get(cost_type, 0) or epsilon
-        val = gain / cost_v
-        best_value[v] = val
-        heapq.heappush(heap, (-val, v))
+        best_value[v] = gain / cost_v
+
+    # Heap lazy dei rapporti guadagno/costo oppure, con fill_budget, indice per costo dei candidati
+    # (che sostituisce l'heap: ogni passo sceglie il miglior nodo ancora acquistabile)
+    heap = []
+    index = None
+    if not fill_budget:
+        heap = [(-val, v) for v, val in best_value.items()]
+        heapq.heapify(heap)
+    else:
+        index = AffordableIndex(
+            {v: G.nodes[v].get(cost_type, 0) or epsilon for v in remaining_nodes}, best_value
+        )
 
     # Ciclo greedy
     with tqdm(total=budget, initial=total_cost, desc="Cost Seeds Greedy", unit="cost") as pbar:
-        while heap and total_cost < budget:
-            # Trova il nodo con il miglior rapporto guadagno/costo
-            while heap:
-                neg_val, v = heapq.heappop(heap)
-                if best_value.get(v, float('-inf')) == -neg_val:
+        while (heap if index is None else len(index)) and total_cost < budget:
+            if index is None:
+                # Trova il nodo con il miglior rapporto guadagno/costo
+                while heap:
+                    neg_val, v = heapq.heappop(heap)
+                    if best_value.get(v, float('-inf')) == -neg_val:
+                        break
+                else:
                     break
             else:
-                break
+                # Trova il miglior nodo tra quelli il cui costo rientra nel budget residuo
+                best = index.best_affordable(budget - total_cost)
+                if best is None:
+                    break
+                v = best[0]
+                index.remove(v)
 
             cost_v = G.nodes[v].get(cost_type, 0) or epsilon
             if total_cost + cost_v > budget:
@@ -142,25 +207,226 @@ def cost_seeds_greedy(
                         affected.add(u)
 
             for u in affected:
-                gain = 0.0
-                for w in G.neighbors(u):
-                    old_count = neighbors_in_S_count[w]
-                    new_count = old_count + 1
-                    delta = compute_delta(
-                        sub_function, old_count, new_count,
-                        half_deg[w], degree[w] if sub_function == sub_function3 else None
-                    )
-                    gain += delta
+                gain = compute_gain(G, u, sub_function, neighbors_in_S_count, half_deg, degree)
                 cost_u = G.nodes[u].get(cost_type, 0) or epsilon
                 new_val = gain / cost_u
                 if new_val != best_value.get(u, None):
                     best_value[u] = new_val
-                    heapq.heappush(heap, (-new_val, u))
+                    if index is None:
+                        heapq.heappush(heap, (-new_val, u))
+                    else:
+                        index.update(u, new_val)
+
+    if run_info is not None:
+        run_info["mode"] = "lazy_heap" if index is None else "lazy_heap_fill_budget"
+
+    return S_selected
+
+
+def _stochastic_greedy(
+        G: nx.Graph,  # noqa
+        budget: Union[int, float],
+        cost_type: str,
+        sub_function: Callable,
+        S_selected: Set[int],  # noqa
+        remaining_nodes: Set[int],
+        total_cost: Union[int, float],
+        neighbors_in_S_count: Dict[int, int],  # noqa
+        half_deg: Dict[int, int],
+        degree: Dict[int, int],
+        sample_epsilon: float,
+        random_state: Optional[int],
+        run_info: Optional[Dict[str, Any]]
+) -> Set[int]:
+    """
+        Stochastic greedy: ad ogni iterazione valuta il rapporto guadagno/costo solo su un campione casuale
+        di s candidati. I guadagni vengono calcolati al momento sui soli nodi campionati, quindi non serve
+        aggiornare i vicini a distanza 2 dopo ogni selezione.
+    """
+    epsilon = 1e-6
+    rng = random.Random(random_state)
+
+    # Lista dei candidati ordinata (riproducibilità) + indice per la rimozione in O(1)
+    candidates = sorted(remaining_nodes)
+    position = {v: i for i, v in enumerate(candidates)}
+
+    mean_cost = sum(G.nodes[v].get(cost_type, 0) for v in G.nodes) / max(1, G.number_of_nodes())
+    sample_size = stochastic_sample_size(len(candidates), budget - total_cost, mean_cost, sample_epsilon)
+    evaluations = 0
+    iterations = 0
+
+    with tqdm(total=budget, initial=total_cost, desc="Stochastic Cost Seeds Greedy", unit="cost") as pbar:
+        while candidates and total_cost < budget:
+            iterations += 1
+            sample = rng.sample(candidates, min(sample_size, len(candidates)))
+            evaluations += len(sample)
+
+            # Miglior nodo del campione (a parità di valore vince l'id più piccolo, come nell'heap)
+            best_v = None
+            best_val = -float('inf')
+            for u in sample:
+                cost_u = G.nodes[u].get(cost_type, 0) or epsilon
+                val = compute_gain(G, u, sub_function, neighbors_in_S_count, half_deg, degree) / cost_u
+                if best_v is None or val > best_val or (val == best_val and u < best_v):
+                    best_val = val
+                    best_v = u
+
+            cost_v = G.nodes[best_v].get(cost_type, 0) or epsilon
+            if total_cost + cost_v > budget:
+                break
+
+            total_cost += cost_v
+            pbar.update(cost_v)
+            S_selected.add(best_v)
+            remaining_nodes.remove(best_v)
+
+            # Rimozione swap-and-pop dalla lista dei candidati
+            idx = position.pop(best_v)
+            last = candidates.pop()
+            if last != best_v:
+                candidates[idx] = last
+                position[last] = idx
+
+            for w in G.neighbors(best_v):
+                neighbors_in_S_count[w] += 1
+
+    if run_info is not None:
+        run_info.update({
+            "mode": "stochastic",
+            "sample_epsilon": sample_epsilon,
+            "random_state": random_state,
+            "sample_size": sample_size,
+            "iterations": iterations,
+            "evaluations": evaluations
+        })
 
     return S_selected
 
 
+def cost_seeds_greedy_trajectories(
+        G: nx.Graph,  # noqa
+        cost_types: List[str],
+        sub_function: Callable,
+        max_budget: Optional[Dict[str, Union[int, float]]] = None
+) -> Dict[str, List[Tuple[int, float]]]:
+    """
+        Input:
+          - G: grafo non orientato (nx.Graph)
+          - cost_types: attributi di costo per cui calcolare la traiettoria greedy (es. ["cost1", "cost2", "cost3"])
+          - sub_function: the submodular function chosen (can be sub_function1, sub_function2, sub_function3)
+          - max_budget: budget massimo per ciascun costo (default: nessun limite, si seleziona ogni nodo)
+        Output:
+          - trajectories: per ogni costo la lista ordinata (nodo, costo cumulativo) delle scelte greedy
+
+    Esegue in un unico passaggio le greedy di tutte le funzioni di costo. Gradi, half_deg e guadagni iniziali
+    non dipendono dal costo e vengono calcolati una sola volta; ogni costo mantiene solo i propri conteggi
+    e il proprio heap dei rapporti guadagno/costo. Il seed set di qualsiasi budget si ottiene come prefisso
+    della traiettoria (seed_set_from_trajectory), identico a quello della sweep con warm start."""
+    if sub_function not in {sub_function1, sub_function2, sub_function3}:
+        raise ValueError("Funzione submodulare non supportata")
+
+    epsilon = 1e-6
+    degree = dict(G.degree())
+    half_deg = {v: ceil_division(deg, 2) for v, deg in degree.items()}
+
+    # Guadagni con S vuoto: condivisi da tutte le funzioni di costo
+    zero_count = {v: 0 for v in G.nodes}
+    initial_gain = {v: compute_gain(G, v, sub_function, zero_count, half_deg, degree) for v in G.nodes}
+
+    states = {}
+    for cost_type in cost_types:
+        costs = {v: G.nodes[v].get(cost_type, 0) or epsilon for v in G.nodes}
+        best_value = {v: initial_gain[v] / costs[v] for v in G.nodes}
+        heap = [(-val, v) for v, val in best_value.items()]
+        heapq.heapify(heap)
+        states[cost_type] = {
+            "costs": costs,
+            "best_value": best_value,
+            "heap": heap,
+            "count": dict(zero_count),
+            "remaining": set(G.nodes),
+            "total_cost": 0,
+            "trajectory": []
+        }
+
+    active = list(cost_types)
+    with tqdm(total=len(cost_types) * G.number_of_nodes(), desc="Cost Seeds Greedy trajectories") as pbar:
+        while active:
+            for cost_type in list(active):
+                state = states[cost_type]
+                heap, best_value, count = state["heap"], state["best_value"], state["count"]
+
+                while heap:
+                    neg_val, v = heapq.heappop(heap)
+                    if best_value.get(v, float('-inf')) == -neg_val:
+                        break
+                else:
+                    active.remove(cost_type)
+                    continue
+
+                cost_v = state["costs"][v]
+                if max_budget is not None and state["total_cost"] + cost_v > max_budget[cost_type]:
+                    active.remove(cost_type)
+                    continue
+
+                state["total_cost"] += cost_v
+                state["trajectory"].append((v, state["total_cost"]))
+                state["remaining"].remove(v)
+                del best_value[v]
+                pbar.update(1)
+
+                for w in G.neighbors(v):
+                    count[w] += 1
+
+                affected = set()
+                for w in G.neighbors(v):
+                    for u in G.neighbors(w):
+                        if u in state["remaining"]:
+                            affected.add(u)
+
+                for u in affected:
+                    new_val = compute_gain(G, u, sub_function, count, half_deg, degree) / state["costs"][u]
+                    if new_val != best_value[u]:
+                        best_value[u] = new_val
+                        heapq.heappush(heap, (-new_val, u))
+
+    return {cost_type: states[cost_type]["trajectory"] for cost_type in cost_types}
+
+
+def seed_set_from_trajectory(trajectory: List[Tuple[int, float]], budget: Union[int, float]) -> Set[int]:
+    """Seed set della greedy per il budget dato: il prefisso più lungo della traiettoria con costo <= budget."""
+    cumulative = [c for _, c in trajectory]
+    return {v for v, _ in trajectory[:bisect.bisect_right(cumulative, budget)]}
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cost Seeds Greedy (heap) su facebook_combined.txt")
+    parser.add_argument("--sample_epsilon", type=float, default=None,
+                        help="Se specificato usa lo stochastic greedy con campioni di dimensione (n/k)ln(1/eps)")
+    parser.add_argument("--random_state", type=int, default=42,
+                        help="Seed del campionamento dello stochastic greedy")
+    parser.add_argument("--fill_budget", action="store_true",
+                        help="Prosegue con il miglior nodo acquistabile invece di fermarsi al primo troppo costoso")
+    parser.add_argument("--multi_cost", action="store_true",
+                        help="Calcola in un solo passaggio le traiettorie greedy di tutte le funzioni di costo "
+                             "e ricava i seed set dei budget come prefissi")
+    parser.add_argument("--checkpoint_interval", type=int, default=None,
+                        help="Salva i seed set come delta rispetto alla riga precedente, con una lista completa "
+                             "ogni N righe (default: lista completa in ogni riga)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Riprende la sweep dall'ultimo checkpoint, saltando i budget già completati")
+    parser.add_argument("--resume_every", type=int, default=10,
+                        help="Numero di budget tra due salvataggi del checkpoint usato da --resume")
+    args = parser.parse_args()
+    if args.multi_cost and args.sample_epsilon is not None:
+        parser.error("--multi_cost non supporta --sample_epsilon: le traiettorie sono deterministiche")
+    if args.multi_cost and args.fill_budget:
+        parser.error("--multi_cost non supporta --fill_budget: i seed set sono prefissi della traiettoria")
+
+    # Opzioni che cambiano i risultati: un checkpoint salvato con opzioni diverse non viene ripreso
+    sweep_config = {"sample_epsilon": args.sample_epsilon, "random_state": args.random_state,
+                    "fill_budget": args.fill_budget, "multi_cost": args.multi_cost}
+
     G = nx.read_edgelist("../data/facebook_combined.txt", nodetype=int)
     G, cost1, cost2, cost3 = assign_cost_attributes(G, use_threshold=False)
 
@@ -177,6 +443,17 @@ if __name__ == "__main__":
         "cost3": "cost3: scaled log10 of betweenness centrality"
     }
 
+    trajectories = None
+    trajectory_time = 0.0
+    if args.multi_cost:
+        start_time = time.time()
+        trajectories = cost_seeds_greedy_trajectories(
+            G, list(cost_functions), sub_function1,
+            max_budget={name: sum(cost.values()) for name, cost in cost_functions.items()}
+        )
+        trajectory_time = time.time() - start_time
+        tqdm.write(f"Trajectories for {list(cost_functions)} computed in {trajectory_time:.2f}s")
+
     for name, cost in cost_functions.items():
         algorithm_name = "CSG"
         cost_function_desc = descriptions[name]
@@ -202,33 +479,50 @@ if __name__ == "__main__":
         current_seed_set: Optional[Set[int]] = None
         current_cost = 0
 
-        for budget_k in tqdm(
-                range(min_budget, max_budget + 1, 100),
-                desc=f"Budget loop for {name}",
-                unit="budget"
-        ):
-            start_time = time.time()
-            S = cost_seeds_greedy(G, budget_k, name, sub_function1, current_seed_set, current_cost)
-            end_time = time.time()
-
-            total_cost = sum(cost[v] for v in S)
-            current_seed_set = S
-            current_cost = total_cost
-
-            exec_time = end_time - start_time
-
-            tqdm.write(f"Function: {name} | Budget: {budget_k}")
-            tqdm.write(f"Seed set size: {len(S)}; Total cost: {total_cost}; Time: {exec_time:.2f}s")
-
-            log_experiment(
-                csv_path=f"./logs/{name}_CSG.csv",
-                algorithm_name=algorithm_name,
-                cost_function=cost_function_desc,
-                use_threshold=False,
-                budget=budget_k,
-                seed_set=S,
-                total_cost=total_cost,
-                execution_time=exec_time,
-                G=G,
-                additional_info={"note": f"Running on facebook_combined.txt with {name}"}
-            )
+        csv_path = f"./logs/{name}_CSG.csv"
+        checkpoint_path = os.path.join(CHECKPOINT_DIR, f"{name}_CSG.json")
+        state = load_checkpoint(checkpoint_path, csv_path, sweep_config) if args.resume else None
+        if state is not None:
+            current_seed_set, current_cost = state["seed_set"], state["current_cost"]
+        with ExperimentLogger(csv_path, checkpoint_interval=args.checkpoint_interval) as logger, \
+                SweepCheckpoint(checkpoint_path, logger, sweep_config, args.resume_every) as checkpoint:
+            for budget_k in tqdm(
+                    range(min_budget, max_budget + 1, 100),
+                    desc=f"Budget loop for {name}",
+                    unit="budget"
+            ):
+                if state is not None and budget_k <= state["last_budget"]:
+                    continue
+
+                run_info = {}
+                start_time = time.time()
+                if trajectories is not None:
+                    S = seed_set_from_trajectory(trajectories[name], budget_k)
+                    run_info.update({"mode": "multi_cost_trajectory", "trajectory_time": trajectory_time})
+                else:
+                    S = cost_seeds_greedy(G, budget_k, name, sub_function1, current_seed_set, current_cost,
+                                          sample_epsilon=args.sample_epsilon, random_state=args.random_state,
+                                          run_info=run_info, fill_budget=args.fill_budget)
+                end_time = time.time()
+
+                total_cost = sum(cost[v] for v in S)
+                current_seed_set = S
+                current_cost = total_cost
+
+                exec_time = end_time - start_time
+
+                tqdm.write(f"Function: {name} | Budget: {budget_k}")
+                tqdm.write(f"Seed set size: {len(S)}; Total cost: {total_cost}; Time: {exec_time:.2f}s")
+
+                logger.log_experiment(
+                    algorithm_name=algorithm_name,
+                    cost_function=cost_function_desc,
+                    use_threshold=False,
+                    budget=budget_k,
+                    seed_set=S,
+                    total_cost=total_cost,
+                    execution_time=exec_time,
+                    G=G,
+                    additional_info={"note": f"Running on facebook_combined.txt with {name}", **run_info}
+                )
+                checkpoint.update(budget_k, S, total_cost)
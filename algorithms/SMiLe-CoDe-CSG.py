@@ -0,0 +1,214 @@
+import os
+import sys
+import argparse
+import multiprocessing as mp
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import networkx as nx
+from tqdm import tqdm
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.utils import assign_cost_attributes, ExperimentLogger  # noqa
+from utils.checkpoint import CHECKPOINT_DIR, SweepCheckpoint, load_checkpoint  # noqa
+from utils.communities import load_or_compute_partition, COMMUNITY_BACKENDS  # noqa
+from utils.submodular import sub_function1  # noqa
+from algorithms.CSG_new import cost_seeds_greedy  # noqa
+
+
+# Sottografi delle comunità e parametri della greedy, impostati una sola volta per processo worker
+# dall'initializer del pool
+_worker = {}
+
+
+def _init_worker(subgraphs: List[nx.Graph], cost_attr: str, sub_function: Callable) -> None:
+    _worker.update(subgraphs=subgraphs, cost_attr=cost_attr, sub_function=sub_function)
+
+
+def _local_csg(task: Tuple[int, int]) -> Tuple[int, Set[int], float]:
+    """Greedy CSG_new sul sottografo indotto di una comunità con il suo budget locale."""
+    comm_index, local_budget = task
+    subgraph, cost_attr = _worker["subgraphs"][comm_index], _worker["cost_attr"]
+    S = cost_seeds_greedy(subgraph, local_budget, cost_attr, _worker["sub_function"])
+    return comm_index, S, sum(subgraph.nodes[v].get(cost_attr, 0) for v in S)
+
+
+class CommunityCSGSelector:
+    """
+        Variante ibrida di SMiLe-CoDe: il budget viene allocato alle comunità in proporzione alla loro
+        dimensione e in ciascuna comunità la selezione è fatta dalla greedy a heap di CSG_new sul sottografo
+        indotto (invece che per betweenness). Le comunità vengono elaborate in parallelo; il budget residuo
+        viene poi speso da una greedy globale che parte dai seed locali ed è ristretta ai nodi di confine
+        (nodi con almeno un vicino in un'altra comunità), gli unici il cui guadagno dipende da più comunità.
+
+        I sottografi delle comunità e il pool di processi vengono creati una sola volta all'ingresso nel
+        context manager e riusati da tutti i budget della sweep: i worker ricevono i sottografi
+        dall'initializer, i task sono solo coppie (comunità, budget locale).
+
+        Uso:
+            with CommunityCSGSelector(G, "cost1", partition=partition, processes=8) as selector:
+                S = selector.query(budget)
+    """
+
+    def __init__(self, G: nx.Graph, cost_attr: str, sub_function: Callable = sub_function1,  # noqa
+                 partition: Optional[Dict[int, int]] = None, processes: Optional[int] = None):
+        self.G = G
+        self.cost_attr = cost_attr
+        self.sub_function = sub_function
+        self.processes = processes
+        if partition is None:
+            partition = load_or_compute_partition(G)
+        communities = {}
+        for node, comm_id in partition.items():
+            communities.setdefault(comm_id, []).append(node)
+        self.communities = list(communities.values())
+        self.boundary = {v for u, w in G.edges() if partition[u] != partition[w] for v in (u, w)}
+        self._pool = None
+
+    def __enter__(self) -> "CommunityCSGSelector":
+        subgraphs = [self.G.subgraph(nodes).copy() for nodes in self.communities]
+        self._pool = mp.Pool(self.processes, initializer=_init_worker,
+                             initargs=(subgraphs, self.cost_attr, self.sub_function))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def query(self, total_budget: int) -> List[int]:
+        if self._pool is None:
+            raise RuntimeError("CommunityCSGSelector va usato come context manager")
+
+        # Un task per ogni comunità con budget locale positivo
+        n = self.G.number_of_nodes()
+        tasks = [(i, int(total_budget * len(nodes) / n)) for i, nodes in enumerate(self.communities)]
+        tasks = [(i, local_budget) for i, local_budget in tasks if local_budget > 0]
+
+        # Unione deterministica nell'ordine delle comunità
+        seeds = []
+        spent = 0
+        for _, S, spent_in_comm in sorted(self._pool.map(_local_csg, tasks), key=lambda r: r[0]):
+            seeds.extend(sorted(S))
+            spent += spent_in_comm
+
+        # Fase globale: la greedy sui nodi di confine esaurisce il budget residuo partendo dai seed locali
+        if spent < total_budget:
+            S_global = cost_seeds_greedy(self.G, total_budget, self.cost_attr, self.sub_function, set(seeds), spent,
+                                         candidates=self.boundary)
+            seeds.extend(sorted(S_global - set(seeds)))
+
+        return seeds
+
+
+def SMiLe_CoDe_CSG(G: nx.Graph, cost_attr: str, total_budget: int,  # noqa
+                   sub_function: Callable = sub_function1,
+                   partition: Optional[Dict[int, int]] = None,
+                   processes: Optional[int] = None) -> List[int]:
+    """
+        Selezione di CommunityCSGSelector per un singolo budget. Per una sweep conviene usare direttamente
+        CommunityCSGSelector, che crea sottografi e pool una sola volta.
+
+        Args:
+            G: Grafo NetworkX
+            cost_attr: Attributo di costo dei nodi
+            total_budget: Budget totale disponibile
+            sub_function: Funzione submodulare usata da cost_seeds_greedy
+            partition: Partizione nodo -> comunità già calcolata (default: Louvain in cache)
+            processes: Dimensione del pool di processi (default: numero di CPU)
+
+        Returns:
+            Lista dei nodi seed selezionati
+    """
+    with CommunityCSGSelector(G, cost_attr, sub_function, partition, processes) as selector:
+        return selector.query(total_budget)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SMiLe-CoDe con CSG locale per comunità su facebook_combined.txt")
+    parser.add_argument("--processes", type=int, default=None, help="Dimensione del pool di processi")
+    parser.add_argument("--community_method", type=str, choices=sorted(COMMUNITY_BACKENDS), default="louvain",
+                        help="Backend di community detection (vedi utils.communities)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Riprende la sweep dall'ultimo checkpoint, saltando i budget già completati")
+    parser.add_argument("--resume_every", type=int, default=10,
+                        help="Numero di budget tra due salvataggi del checkpoint usato da --resume")
+    args = parser.parse_args()
+
+    # Opzioni che cambiano i risultati: un checkpoint salvato con opzioni diverse non viene ripreso
+    sweep_config = {"community_method": args.community_method, "global_phase": "boundary"}
+
+    G = nx.read_edgelist("../data/facebook_combined.txt", nodetype=int)
+    G, cost1, cost2, cost3 = assign_cost_attributes(G, use_threshold=False)
+
+    # Configurazioni funzioni di costo e relative descrizioni
+    cost_functions = {
+        "cost1": cost1,
+        "cost2": cost2,
+        "cost3": cost3
+    }
+
+    descriptions = {
+        "cost1": "cost1: ceiling function of degree(v) / 2",
+        "cost2": "cost2: random int in [min(cost1), max(cost1)]",
+        "cost3": "cost3: scaled log10 of betweenness centrality"
+    }
+
+    for name, cost in cost_functions.items():
+        algorithm_name = "SMiLe-CoDe-CSG"
+        cost_function_desc = descriptions[name]
+
+        # Calcolo range del budget
+        min_budget = int(max(cost.values()))
+        max_budget = int(sum(cost.values()))
+
+        if min_budget > max_budget:
+            print(f"MinBudget > MaxBudget for {name}")
+            min_budget, max_budget = max_budget, min_budget
+
+        if min_budget == max_budget:
+            print(f"MinBudget = MaxBudget for {name}")
+            continue
+
+        tqdm.write(f"\n{name} — budget da {min_budget} a {max_budget}")
+
+        partition = load_or_compute_partition(G, method=args.community_method)
+
+        csv_path = f"./logs/{name}_SMiLe-CoDe-CSG.csv"
+        checkpoint_path = os.path.join(CHECKPOINT_DIR, f"{name}_SMiLe-CoDe-CSG.json")
+        state = load_checkpoint(checkpoint_path, csv_path, sweep_config) if args.resume else None
+        with ExperimentLogger(csv_path) as logger, \
+                SweepCheckpoint(checkpoint_path, logger, sweep_config, args.resume_every) as checkpoint, \
+                CommunityCSGSelector(G, name, partition=partition, processes=args.processes) as selector:
+            for budget_k in tqdm(
+                    range(min_budget, max_budget + 1, 100),
+                    desc=f"Budget loop for {name}",
+                    unit="budget"
+            ):
+                if state is not None and budget_k <= state["last_budget"]:
+                    continue
+
+                start_time = time.time()
+                S = selector.query(budget_k)
+                end_time = time.time()
+
+                total_cost = sum(cost[v] for v in S)
+                exec_time = end_time - start_time
+
+                tqdm.write(f"Function: {name} | Budget: {budget_k}")
+                tqdm.write(f"Seed set size: {len(S)}; Total cost: {total_cost}; Time: {exec_time:.2f}s")
+                logger.log_experiment(
+                    algorithm_name=algorithm_name,
+                    cost_function=cost_function_desc,
+                    use_threshold=False,
+                    budget=budget_k,
+                    seed_set=set(S),
+                    total_cost=total_cost,
+                    execution_time=exec_time,
+                    G=G,
+                    additional_info={"note": f"Running on facebook_combined.txt with {name}"}
+                )
+                checkpoint.update(budget_k, S, total_cost)
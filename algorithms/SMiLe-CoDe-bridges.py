@@ -1,8 +1,9 @@
 import os
 import sys
 import json
+import argparse
+from typing import Dict, List, Optional, Sequence
 import networkx as nx
-import community as community_louvain
 from tqdm import tqdm
 import time
 
@@ -10,13 +11,17 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from utils.utils import assign_cost_attributes, log_experiment  # noqa
+from utils.utils import assign_cost_attributes, ExperimentLogger  # noqa
+from utils.checkpoint import CHECKPOINT_DIR, SweepCheckpoint, load_checkpoint  # noqa
+from utils.communities import load_or_compute_partition, COMMUNITY_BACKENDS  # noqa
+from utils.smile_code import SelectionContext, load_betweenness  # noqa
+from utils.parallel_selection import ParallelLocalSelector  # noqa
+from utils.bridges import load_local_bridges  # noqa
 
 
-BRIDGE_FILE = './facebook_local_bridges.json'
-
 def SMiLe_CoDe(G: nx.Graph, cost_attr: str, total_budget: int,  # noqa
-               centrality_file: str = "./facebook_betweenness.json"):  # noqa
+               centrality_file: str = "./facebook_betweenness.json",  # noqa
+               partition: Optional[Dict[int, int]] = None):
     """
         Alloca il budget alle comunità in proporzione alla loro dimensione ed esegue una selezione
         greedy (basata sulla centralità) all'interno di ciascuna comunità.
@@ -26,6 +31,8 @@ def SMiLe_CoDe(G: nx.Graph, cost_attr: str, total_budget: int,  # noqa
             cost_attr: Attributo di costo dei nodi
             total_budget: Budget totale disponibile
             centrality_file: Percorso al file della betweenness centrality (opzionale)
+            partition: Partizione nodo -> comunità già calcolata; se assente viene usata quella di Louvain
+                in cache (calcolata una sola volta per grafo, vedi utils.communities)
 
         Returns:
             Lista dei nodi seed selezionati
@@ -38,8 +45,9 @@ def SMiLe_CoDe(G: nx.Graph, cost_attr: str, total_budget: int,  # noqa
         bc = {int(k): float(v) for k, v in bc.items()}
         nx.set_node_attributes(G, bc, "betweenness")
 
-    # Rilevamento delle comunità usando il metodo di Louvain
-    partition = community_louvain.best_partition(G)
+    # Rilevamento delle comunità usando il metodo di Louvain (riusata tra le chiamate)
+    if partition is None:
+        partition = load_or_compute_partition(G)
     communities = {}
     for node, comm_id in partition.items():
         communities.setdefault(comm_id, []).append(node)
@@ -92,18 +100,7 @@ def SMiLe_CoDe(G: nx.Graph, cost_attr: str, total_budget: int,  # noqa
     if remaining_budget > 0:
         print(f"Remaining budget: {remaining_budget}, selecting globally...")
 
-        if os.path.exists(BRIDGE_FILE):
-            print("Loading local bridges from file...")
-            with open(BRIDGE_FILE, "r") as f:
-                local_bridges = [tuple(edge) for edge in json.load(f)]
-        else:
-            print("Computing local bridges...")
-            local_bridges = list(nx.local_bridges(G))
-            with open(BRIDGE_FILE, "w") as f:
-                json.dump([list(edge) for edge in local_bridges], f)
-            print("Local bridges saved on disk.")
-
-        local_bridges = set(local_bridges)
+        local_bridges = set(load_local_bridges(G))
         bridge_nodes = set()
         for t in local_bridges:
             n1, n2 = t[0], t[1]
@@ -156,7 +153,43 @@ def SMiLe_CoDe(G: nx.Graph, cost_attr: str, total_budget: int,  # noqa
     return seeds
 
 
+def SMiLe_CoDe_sweep(G: nx.Graph, cost_attr: str, budgets: Sequence[int],  # noqa
+                     centrality_file: str = "./facebook_betweenness.json",  # noqa
+                     partition: Optional[Dict[int, int]] = None) -> List[List[int]]:
+    """
+        Esegue SMiLe-CoDe (variante bridges) per tutti i budget in una sola chiamata.
+
+        Args:
+            G: Grafo NetworkX
+            cost_attr: Attributo di costo dei nodi
+            budgets: Budget da valutare
+            centrality_file: Percorso al file della betweenness centrality
+            partition: Partizione nodo -> comunità già calcolata (default: Louvain in cache)
+
+        Returns:
+            Lista dei seed set (liste di nodi), uno per budget e nello stesso ordine di budgets
+    """
+    if partition is None:
+        partition = load_or_compute_partition(G)
+    context = SelectionContext(G, cost_attr, partition, load_betweenness(centrality_file), load_local_bridges(G))
+    return context.sweep(budgets)
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SMiLe-CoDe su facebook_combined.txt")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Se specificato, la fase locale di ogni budget viene eseguita in parallelo su N processi")
+    parser.add_argument("--community_method", type=str, choices=sorted(COMMUNITY_BACKENDS), default="louvain",
+                        help="Backend di community detection (vedi utils.communities)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Riprende la sweep dall'ultimo checkpoint, saltando i budget già completati")
+    parser.add_argument("--resume_every", type=int, default=10,
+                        help="Numero di budget tra due salvataggi del checkpoint usato da --resume")
+    args = parser.parse_args()
+
+    # Opzioni che cambiano i risultati: un checkpoint salvato con opzioni diverse non viene ripreso
+    sweep_config = {"community_method": args.community_method}
+
     G = nx.read_edgelist("../data/facebook_combined.txt", nodetype=int)
     G, cost1, cost2, cost3 = assign_cost_attributes(G, use_threshold=False)
 
@@ -196,34 +229,56 @@ if __name__ == "__main__":
 
         tqdm.write(f"\n{name} — budget da {min_budget} a {max_budget}")
 
-        for budget_k in tqdm(
-                range(min_budget, max_budget + 1, 100),
-                desc=f"Budget loop for {name}",
-                unit="budget"
-        ):
-            start_time = time.time()
-            S = SMiLe_CoDe(
-                G,
-                name,
-                budget_k,
-                centrality_file="./facebook_betweenness.json"
-            )
-            end_time = time.time()
-
-            total_cost = sum(cost[v] for v in S)
-            exec_time = end_time - start_time
-
-            tqdm.write(f"Function: {name} | Budget: {budget_k}")
-            tqdm.write(f"Seed set size: {len(S)}; Total cost: {total_cost}; Time: {exec_time:.2f}s")
-            log_experiment(
-                csv_path=f"./logs/{name}_SMiLe-CoDe-bridges.csv",
-                algorithm_name=algorithm_name,
-                cost_function=cost_function_desc,
-                use_threshold=False,
-                budget=budget_k,
-                seed_set=set(S),
-                total_cost=total_cost,
-                execution_time=exec_time,
-                G=G,
-                additional_info={"note": f"Running on facebook_combined.txt with {name}"}
-            )
+        # Con --resume vengono calcolati solo i budget successivi all'ultimo checkpoint
+        csv_path = f"./logs/{name}_SMiLe-CoDe-bridges.csv"
+        checkpoint_path = os.path.join(CHECKPOINT_DIR, f"{name}_SMiLe-CoDe-bridges.json")
+        state = load_checkpoint(checkpoint_path, csv_path, sweep_config) if args.resume else None
+        budgets = [budget_k for budget_k in range(min_budget, max_budget + 1, 100)
+                   if state is None or budget_k > state["last_budget"]]
+        if not budgets:
+            continue
+
+        # La partizione è la stessa per tutti i budget: calcolata (o caricata) una volta sola
+        partition = load_or_compute_partition(G, method=args.community_method)
+
+        # Ordinamenti e costi precalcolati: ogni budget richiede solo la fase di selezione
+        start_time = time.time()
+        context = SelectionContext(G, name, partition, load_betweenness("./facebook_betweenness.json"),
+                                   load_local_bridges(G))
+        context_time = time.time() - start_time
+
+        # Tutti i budget della sweep in una sola chiamata; il tempo viene ripartito tra i budget
+        start_time = time.time()
+        if args.processes:
+            with ParallelLocalSelector(context, processes=args.processes) as selector:
+                seed_sets = [selector.query(budget_k) for budget_k in budgets]
+        else:
+            seed_sets = context.sweep(budgets)
+        sweep_time = time.time() - start_time
+
+        with ExperimentLogger(csv_path) as logger, \
+                SweepCheckpoint(checkpoint_path, logger, sweep_config, args.resume_every) as checkpoint:
+            for budget_k, S in tqdm(
+                    zip(budgets, seed_sets),
+                    total=len(budgets),
+                    desc=f"Budget loop for {name}",
+                    unit="budget"
+            ):
+                total_cost = sum(cost[v] for v in S)
+                exec_time = sweep_time / len(budgets)
+
+                tqdm.write(f"Function: {name} | Budget: {budget_k}")
+                tqdm.write(f"Seed set size: {len(S)}; Total cost: {total_cost}; Time: {exec_time:.2f}s")
+                logger.log_experiment(
+                    algorithm_name=algorithm_name,
+                    cost_function=cost_function_desc,
+                    use_threshold=False,
+                    budget=budget_k,
+                    seed_set=set(S),
+                    total_cost=total_cost,
+                    execution_time=exec_time,
+                    G=G,
+                    additional_info={"note": f"Running on facebook_combined.txt with {name}",
+                                     "context_time": context_time, "sweep_time": sweep_time}
+                )
+                checkpoint.update(budget_k, S, total_cost)
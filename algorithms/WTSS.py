@@ -1,4 +1,10 @@
+import argparse
+import bisect
+import heapq
+import itertools
+from typing import List, Optional, Set, Tuple
 import networkx as nx
+import numpy as np
 from tqdm import tqdm
 import os
 import sys
@@ -7,7 +13,9 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from utils.utils import assign_cost_attributes, log_experiment  # noqa
+from utils.utils import assign_cost_attributes, assign_cost_arrays, ExperimentLogger  # noqa
+from utils.checkpoint import CHECKPOINT_DIR, SweepCheckpoint, load_checkpoint  # noqa
+from utils.graph_arrays import CSRGraph  # noqa
 
 
 def WTSS(G: nx.Graph, t: dict, c: dict, budget: int):  # noqa
@@ -89,10 +97,285 @@ def WTSS(G: nx.Graph, t: dict, c: dict, budget: int):  # noqa
     return S
 
 
+def WTSS_indexed(G: nx.Graph, t: dict, c: dict, budget: int, events: Optional[List[int]] = None):  # noqa
+    """
+    Versione indicizzata di WTSS, O(m log n): stesso input/output di WTSS.
+    Se events è una lista, vi vengono aggiunti in ordine i vertici incontrati nel Case 2.
+
+    Invece di scandire U ad ogni iterazione mantiene tre code con invalidazione lazy:
+      - zero_thr: min-heap dei vertici con k(v) = 0 (Case 1)
+      - impossible: min-heap dei vertici con δ(v) < k(v) (Case 2)
+      - priority: heap di (-score(v), v) con score(v) = c(v)·k(v) / (δ(v)·(δ(v)+1)) (Case 3)
+    Una voce viene inserita solo quando k o δ di un vertice cambia, e scartata all'estrazione se non più valida.
+    A parità di condizione viene scelto il vertice con id minore, che per nodi interi corrisponde all'ordine
+    di iterazione di U in WTSS: i seed set prodotti sono gli stessi.
+    """
+
+    V = set(G.nodes())
+    U = set(G.nodes())
+    S = set()  # noqa
+    total_cost = 0  # noqa
+
+    delta = {v: G.degree(v) for v in V}
+    k = dict(t)
+    N = {v: set(G.neighbors(v)) for v in V}
+
+    def score(v):
+        return c[v] * k[v] / (delta[v] * (delta[v] + 1))
+
+    zero_thr = []
+    impossible = []
+    priority = []
+
+    def push(v):
+        """Inserisce v nelle code la cui condizione è (ora) soddisfatta."""
+        if k[v] == 0:
+            heapq.heappush(zero_thr, v)
+        elif delta[v] < k[v]:
+            heapq.heappush(impossible, v)
+        else:
+            heapq.heappush(priority, (-score(v), v))
+
+    def pop_valid(heap, is_valid):
+        while heap and not is_valid(heap[0]):
+            heapq.heappop(heap)
+        return heapq.heappop(heap) if heap else None
+
+    for v in V:
+        push(v)
+
+    pbar = tqdm(total=len(V), desc="WTSS (indexed) progress")
+
+    def activate_and_remove(v):
+        """Riduce la threshold dei vicini di v ancora in U, poi rimuove v aggiornando δ e le code."""
+        for u in N[v]:
+            k[u] = max(0, k[u] - 1)
+            delta[u] -= 1
+            N[u].remove(v)
+        for u in N[v]:
+            push(u)
+        U.remove(v)
+        N[v].clear()
+        pbar.update(1)
+
+    while U:
+        v = pop_valid(zero_thr, lambda x: x in U and k[x] == 0)
+        if v is not None:  # Case 1
+            activate_and_remove(v)
+            continue
+
+        v = pop_valid(impossible, lambda x: x in U and delta[x] < k[x])
+        if v is not None:  # Case 2
+            if events is not None:
+                events.append(v)
+            if total_cost + c[v] < budget:
+                S.add(v)
+                total_cost += c[v]
+            elif total_cost + c[v] == budget:
+                S.add(v)
+                total_cost += c[v]
+                pbar.close()
+                return S
+            activate_and_remove(v)
+            continue
+
+        # Case 3: il vertice rimosso non influenza i vicini (k invariato), cambia solo il loro δ
+        _, v = pop_valid(priority, lambda x: x[1] in U and k[x[1]] > 0 and delta[x[1]] >= k[x[1]]
+                         and -x[0] == score(x[1]))
+        for u in N[v]:
+            delta[u] -= 1
+            N[u].remove(v)
+        for u in N[v]:
+            push(u)
+        U.remove(v)
+        N[v].clear()
+        pbar.update(1)
+
+    pbar.close()
+    return S
+
+
+def WTSS_event_log(G: nx.Graph, t: dict, c: dict) -> Tuple[List[int], List[float]]:  # noqa
+    """
+    Esegue WTSS una sola volta senza vincolo di budget e registra la sequenza dei vertici del Case 2.
+
+    L'ordine di eliminazione non dipende dal budget: nel Case 2 il vertice viene rimosso e influenza i vicini
+    sia che venga aggiunto a S sia che venga scartato. Il budget decide quindi solo quali eventi del Case 2
+    entrano in S, e il seed set di qualsiasi budget si ricostruisce con WTSS_replay senza toccare il grafo.
+
+    Output:
+      - events: vertici del Case 2 nell'ordine in cui vengono incontrati
+      - cutoffs: costi cumulativi degli eventi; cutoffs[i] è il budget oltre il quale l'evento i non viene
+        più scartato (per budget < cutoffs[i] si inizia a saltare aggiunte a partire dall'evento i)
+    """
+    events: List[int] = []
+    WTSS_indexed(G, t, c, float("inf"), events=events)
+
+    cutoffs = []
+    total = 0
+    for v in events:
+        total += c[v]
+        cutoffs.append(total)
+    return events, cutoffs
+
+
+def WTSS_replay(events: List[int], c: dict, budget: int, cutoffs: Optional[List[float]] = None) -> Set[int]:
+    """
+    Ricostruisce il seed set di WTSS(G, t, c, budget) dal log degli eventi del Case 2.
+
+    Il prefisso degli eventi che rientra nel budget viene trovato con una ricerca binaria sui cutoff;
+    la coda viene riprodotta con le stesse regole di WTSS (aggiunta se il costo totale resta < budget,
+    arresto se diventa esattamente uguale al budget, altrimenti l'evento viene saltato).
+    """
+    if cutoffs is None:
+        cutoffs = list(itertools.accumulate(c[v] for v in events))
+
+    # Gli eventi del prefisso hanno costo cumulativo < budget; quello che lo eguaglia chiude l'esecuzione
+    prefix = bisect.bisect_left(cutoffs, budget)
+    S = set(events[:prefix])
+    if prefix < len(cutoffs) and cutoffs[prefix] == budget:
+        S.add(events[prefix])
+        return S
+
+    total_cost = cutoffs[prefix - 1] if prefix > 0 else 0
+    for v in events[prefix:]:
+        if total_cost + c[v] < budget:
+            S.add(v)
+            total_cost += c[v]
+        elif total_cost + c[v] == budget:
+            S.add(v)
+            return S
+    return S
+
+
+def WTSS_csr(csr: CSRGraph, t: np.ndarray, c: np.ndarray, budget: int,  # noqa
+             events: Optional[List[int]] = None) -> Set[int]:
+    """
+    WTSS indicizzato su rappresentazione CSR, per grafi con milioni di nodi.
+
+    Input:
+      - csr: grafo in formato CSRGraph
+      - t: array int delle threshold, allineato a csr.nodes
+      - c: array dei costi, allineato a csr.nodes
+      - budget: costo massimo totale ammissibile
+      - events: se è una lista, vi vengono aggiunti gli id dei vertici incontrati nel Case 2
+
+    Output:
+      - S: target set (id originali dei nodi) con costo totale <= budget
+
+    Stessa logica e stessi seed set di WTSS_indexed, ma senza copiare l'adiacenza: i vicini ancora in U
+    si ottengono filtrando la riga CSR con la bitmask removed, mentre δ e k sono array NumPy int32.
+    """
+    n = csr.num_nodes
+    indptr, indices = csr.indptr, csr.indices
+    delta = csr.degree.astype(np.int32)
+    k = np.asarray(t, dtype=np.int32).copy()
+    removed = np.zeros(n, dtype=bool)
+    cost = np.asarray(c, dtype=np.float64)
+
+    S = set()  # noqa
+    total_cost = 0  # noqa
+
+    def score(v):
+        d = int(delta[v])
+        return float(cost[v]) * int(k[v]) / (d * (d + 1))
+
+    zero_thr = []
+    impossible = []
+    priority = []
+
+    def push(v):
+        if k[v] == 0:
+            heapq.heappush(zero_thr, v)
+        elif delta[v] < k[v]:
+            heapq.heappush(impossible, v)
+        else:
+            heapq.heappush(priority, (-score(v), v))
+
+    def pop_valid(heap, is_valid):
+        while heap and not is_valid(heap[0]):
+            heapq.heappop(heap)
+        return heapq.heappop(heap) if heap else None
+
+    for v in range(n):
+        push(v)
+
+    pbar = tqdm(total=n, desc="WTSS (CSR) progress")
+
+    def remove(v, influence):
+        """Rimuove v; se influence è True riduce anche la threshold dei vicini ancora in U."""
+        nbrs = indices[indptr[v]:indptr[v + 1]]
+        alive = nbrs[~removed[nbrs]]
+        if influence:
+            k[alive] = np.maximum(k[alive] - 1, 0)
+        delta[alive] -= 1
+        removed[v] = True
+        for u in alive.tolist():
+            push(u)
+        pbar.update(1)
+
+    remaining = n
+    while remaining:
+        remaining -= 1
+
+        v = pop_valid(zero_thr, lambda x: not removed[x] and k[x] == 0)
+        if v is not None:  # Case 1
+            remove(v, influence=True)
+            continue
+
+        v = pop_valid(impossible, lambda x: not removed[x] and delta[x] < k[x])
+        if v is not None:  # Case 2
+            if events is not None:
+                events.append(csr.nodes[v].item())
+            if total_cost + cost[v] < budget:
+                S.add(csr.nodes[v].item())
+                total_cost += cost[v]
+            elif total_cost + cost[v] == budget:
+                S.add(csr.nodes[v].item())
+                total_cost += cost[v]
+                pbar.close()
+                return S
+            remove(v, influence=True)
+            continue
+
+        # Case 3
+        _, v = pop_valid(priority, lambda x: not removed[x[1]] and k[x[1]] > 0 and delta[x[1]] >= k[x[1]]
+                         and -x[0] == score(x[1]))
+        remove(v, influence=False)
+
+    pbar.close()
+    return S
+
+
 if __name__ == "__main__":
-    G = nx.read_edgelist("../data/facebook_combined.txt", nodetype=int)
+    parser = argparse.ArgumentParser(description="WTSS su facebook_combined.txt")
+    parser.add_argument("--replay", action="store_true",
+                        help="Esegue WTSS una sola volta per funzione di costo e ricostruisce ogni budget dal log "
+                             "degli eventi del Case 2")
+    parser.add_argument("--csr", action="store_true",
+                        help="Usa il motore su array CSR (memoria compatta) invece dei dizionari di networkx")
+    parser.add_argument("--resume", action="store_true",
+                        help="Riprende la sweep dall'ultimo checkpoint, saltando i budget già completati")
+    parser.add_argument("--resume_every", type=int, default=10,
+                        help="Numero di budget tra due salvataggi del checkpoint usato da --resume")
+    args = parser.parse_args()
+    if args.csr and args.replay:
+        parser.error("--replay ricostruisce i budget sul grafo networkx e non è compatibile con --csr")
+
+    # Opzioni che cambiano i risultati: un checkpoint salvato con opzioni diverse non viene ripreso
+    sweep_config = {"replay": args.replay}
 
-    G, cost1, cost2, cost3, threshold = assign_cost_attributes(G, use_threshold=True)
+    csr, order = None, None
+    if args.csr:
+        # Solo array CSR, senza mai costruire il grafo networkx: costi e threshold sono array allineati a
+        # csr.nodes e il CSRGraph prende il posto di G nei log
+        csr, order = CSRGraph.from_edgelist("../data/facebook_combined.txt", return_order=True)
+        cost1, cost2, cost3, threshold = assign_cost_arrays(csr, order)
+        threshold_array = threshold.astype(np.int32)
+        G = csr
+    else:
+        G = nx.read_edgelist("../data/facebook_combined.txt", nodetype=int)
+        G, cost1, cost2, cost3, threshold = assign_cost_attributes(G, use_threshold=True)
 
     # Configurazioni funzioni di costo e relative descrizioni
     cost_functions = {
@@ -112,13 +395,13 @@ if __name__ == "__main__":
         algorithm_name = "WTSS"
         cost_function_desc = descriptions[name]
 
-        # Calcolo range del budget
-        min_budget = int(max(cost.values()))
+        # Calcolo range del budget (con gli array CSR la somma segue l'ordine dei nodi di networkx)
+        min_budget = int(max(cost.values())) if csr is None else int(cost.max())
         """if int(min(cost.values())) > 0:
             max_budget = int(min(cost.values())*(len(G.nodes())))
         else:
             max_budget = (int(min(cost.values())+1) * (len(G.nodes())))"""
-        max_budget = int(sum(cost.values()))
+        max_budget = int(sum(cost.values())) if csr is None else int(sum(cost[order].tolist()))
         if min_budget > max_budget:
             print(f"MinBudget > MaxBudget for {name}")
             min_budget, max_budget = max_budget, min_budget
@@ -133,42 +416,84 @@ if __name__ == "__main__":
         max_no_change = 5
         prev_seed_set = set()
 
-        for budget_k in tqdm(
-                range(min_budget, max_budget + 1, 100),
-                desc=f"Budget loop for {name}",
-                unit="budget"
-        ):
+        csv_path = f"./logs/{name}_WTSS.csv"
+        checkpoint_path = os.path.join(CHECKPOINT_DIR, f"{name}_WTSS.json")
+        state = load_checkpoint(checkpoint_path, csv_path, sweep_config) if args.resume else None
+        if state is not None:
+            early_stop_counter, prev_seed_set = state["early_stop_counter"], state["seed_set"]
+            if state["stopped"]:
+                print(f"Sweep for {name} already completed at budget {state['last_budget']}.")
+                continue
+
+        events, cutoffs = None, None
+        if args.replay:
             start_time = time.time()
-            S = WTSS(G, threshold, cost, budget_k)
-            end_time = time.time()
-
-            total_cost = sum(cost[v] for v in S)
-            exec_time = end_time - start_time
-
-            print(f"\nFunction: {name} | Budget: {budget_k}")
-            print(f"Target set size: {len(S)}")
-            print(f"Total cost: {total_cost}")
-            print(f"Execution time: {exec_time:.2f} seconds")
-
-            log_experiment(
-                csv_path=f"./logs/{name}_WTSS.csv",
-                algorithm_name=algorithm_name,
-                cost_function=cost_function_desc,
-                use_threshold=True,
-                budget=budget_k,
-                seed_set=S,
-                total_cost=total_cost,
-                execution_time=exec_time,
-                G=G,
-                additional_info={"note": f"Running on facebook_combined.txt with {name}"}
-            )
-
-            if set(S) == prev_seed_set:
-                early_stop_counter += 1
-            else:
-                early_stop_counter = 0
-                prev_seed_set = set(S)
-
-            if early_stop_counter >= max_no_change:
-                print(f"Early stopping triggered after {early_stop_counter} unchanged iterations.")
-                break
+            events, cutoffs = WTSS_event_log(G, threshold, cost)
+            event_log_time = time.time() - start_time
+            print(f"Event log for {name}: {len(events)} Case 2 events in {event_log_time:.2f} seconds")
+
+        with ExperimentLogger(csv_path) as logger, \
+                SweepCheckpoint(checkpoint_path, logger, sweep_config, args.resume_every) as checkpoint:
+            for budget_k in tqdm(
+                    range(min_budget, max_budget + 1, 100),
+                    desc=f"Budget loop for {name}",
+                    unit="budget"
+            ):
+                if state is not None and budget_k <= state["last_budget"]:
+                    continue
+
+                start_time = time.time()
+                if events is not None:
+                    S = WTSS_replay(events, cost, budget_k, cutoffs)
+                elif csr is not None:
+                    S = WTSS_csr(csr, threshold_array, cost, budget_k)
+                else:
+                    S = WTSS_indexed(G, threshold, cost, budget_k)
+                end_time = time.time()
+
+                if csr is None:
+                    total_cost = sum(cost[v] for v in S)
+                else:
+                    total_cost = sum(cost[np.searchsorted(csr.nodes, list(S))].tolist())
+                exec_time = end_time - start_time
+
+                print(f"\nFunction: {name} | Budget: {budget_k}")
+                print(f"Target set size: {len(S)}")
+                print(f"Total cost: {total_cost}")
+                print(f"Execution time: {exec_time:.2f} seconds")
+
+                logger.log_experiment(
+                    algorithm_name=algorithm_name,
+                    cost_function=cost_function_desc,
+                    use_threshold=True,
+                    budget=budget_k,
+                    seed_set=S,
+                    total_cost=total_cost,
+                    execution_time=exec_time,
+                    G=G,
+                    additional_info={"note": f"Running on facebook_combined.txt with {name}",
+                                     **({"mode": "replay", "event_log_time": event_log_time}
+                                        if events is not None else {})}
+                )
+
+                if events is not None:
+                    # Oltre il costo totale degli eventi il seed set contiene tutti i vertici del Case 2
+                    # e non cambia più
+                    stopped = not cutoffs or budget_k >= cutoffs[-1]
+                    checkpoint.update(budget_k, S, total_cost, early_stop_counter=0, stopped=stopped)
+                    if stopped:
+                        print(f"Seed set saturated at budget {budget_k}.")
+                        break
+                    continue
+
+                if set(S) == prev_seed_set:
+                    early_stop_counter += 1
+                else:
+                    early_stop_counter = 0
+                    prev_seed_set = set(S)
+
+                stopped = early_stop_counter >= max_no_change
+                checkpoint.update(budget_k, S, total_cost, early_stop_counter=early_stop_counter, stopped=stopped)
+                if stopped:
+                    print(f"Early stopping triggered after {early_stop_counter} unchanged iterations.")
+                    break
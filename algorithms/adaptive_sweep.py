@@ -0,0 +1,151 @@
+import os
+import sys
+import time
+import argparse
+import networkx as nx
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.utils import assign_cost_attributes, ExperimentLogger, CASCADE_HEADERS  # noqa
+from utils.adaptive import adaptive_sweep  # noqa
+from utils.communities import COMMUNITY_BACKENDS  # noqa
+from algorithms.seed_selectors import build_selector, SELECTOR_ALGORITHMS  # noqa
+from algorithms.cascade import majority_cascade  # noqa
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep adattiva dei budget su facebook_combined.txt")
+    parser.add_argument("--algorithm", type=str, choices=SELECTOR_ALGORITHMS, required=True,
+                        help="Algoritmo di selezione dei seed")
+    parser.add_argument("--initial_points", type=int, default=17,
+                        help="Numero di budget equispaziati della griglia iniziale")
+    parser.add_argument("--tolerance", type=float, default=0.01,
+                        help="Variazione massima (frazione di |V|) di numero di seed o influenza tra due budget "
+                             "vicini oltre la quale l'intervallo viene raffinato")
+    parser.add_argument("--step", type=int, default=100,
+                        help="Passo della griglia più fine (quello della sweep a passo fisso)")
+    parser.add_argument("--no_influence", action="store_true",
+                        help="Raffina solo sul numero di seed, senza eseguire la Majority Cascade")
+    parser.add_argument("--community_method", type=str, choices=sorted(COMMUNITY_BACKENDS), default="louvain",
+                        help="Backend di community detection per SMiLe-CoDe (vedi utils.communities)")
+    args = parser.parse_args()
+
+    G = nx.read_edgelist("../data/facebook_combined.txt", nodetype=int)
+    G, cost1, cost2, cost3, threshold = assign_cost_attributes(G, use_threshold=True)
+    n = G.number_of_nodes()
+
+    # Configurazioni funzioni di costo e relative descrizioni
+    cost_functions = {
+        "cost1": cost1,
+        "cost2": cost2,
+        "cost3": cost3
+    }
+
+    descriptions = {
+        "cost1": "cost1: ceiling function of degree(v) / 2",
+        "cost2": "cost2: random int in [min(cost1), max(cost1)]",
+        "cost3": "cost3: scaled log10 of betweenness centrality"
+    }
+
+    for name, cost in cost_functions.items():
+        algorithm_name = args.algorithm
+        cost_function_desc = descriptions[name]
+
+        # Stesso range e stessa griglia della sweep a passo fisso
+        min_budget = int(max(cost.values()))
+        max_budget = int(sum(cost.values()))
+        if min_budget > max_budget:
+            print(f"MinBudget > MaxBudget for {name}")
+            min_budget, max_budget = max_budget, min_budget
+
+        if min_budget == max_budget:
+            print(f"MinBudget = MaxBudget for {name}")
+            continue
+
+        num_points = (max_budget - min_budget) // args.step + 1
+        print(f"\n{name} — budget from {min_budget} to {max_budget} ({num_points} grid points)")
+
+        setup_info = {}
+        selector = build_selector(G, args.algorithm, name, community_method=args.community_method,
+                                  setup_info=setup_info)
+        print(f"Selector for {name} ready in {setup_info['setup_time']:.2f} seconds")
+
+        # Risultati completi per indice della griglia, scritti in ordine di budget alla fine
+        evaluations = {}
+
+        def evaluate(i):
+            budget_k = min_budget + i * args.step
+            start_time = time.time()
+            S = selector(budget_k)
+            exec_time = time.time() - start_time
+
+            final_influence, rounds, cascade_time = set(S), 0, 0.0
+            if not args.no_influence:
+                start_time = time.time()
+                final_influence, rounds = majority_cascade(G, S)
+                cascade_time = time.time() - start_time
+
+            evaluations[i] = (budget_k, S, exec_time, final_influence, rounds, cascade_time)
+            print(f"Function: {name} | Budget: {budget_k} | Seeds: {len(S)} | Influence: {len(final_influence)}")
+            return len(S), len(final_influence)
+
+        sampled = adaptive_sweep(
+            evaluate,
+            num_points,
+            initial_points=args.initial_points,
+            tolerance=args.tolerance * n,
+            saturated=None if args.no_influence else lambda metrics: metrics[1] >= n
+        )
+        print(f"{name}: {len(sampled)} budgets evaluated out of {num_points}")
+
+        # Entrambi i log sostituiscono quelli di un'esecuzione precedente: experiment_result_row si
+        # riferisce solo alle righe di questa sweep
+        csv_path = f"./logs/{name}_{args.algorithm}_adaptive.csv"
+        cascade_csv_path = f"./logs/cascade_results/{name}_{args.algorithm}_adaptive_results.csv"
+        for path in (csv_path, cascade_csv_path):
+            if os.path.exists(f"{path}.tmp"):
+                os.remove(f"{path}.tmp")  # residuo di un'esecuzione interrotta
+
+        with ExperimentLogger(f"{csv_path}.tmp") as logger:
+            for i, _ in sampled:
+                budget_k, S, exec_time, _, _, _ = evaluations[i]
+                logger.log_experiment(
+                    algorithm_name=algorithm_name,
+                    cost_function=cost_function_desc,
+                    use_threshold=args.algorithm == "WTSS",
+                    budget=budget_k,
+                    seed_set=S,
+                    total_cost=sum(cost[v] for v in S),
+                    execution_time=exec_time,
+                    G=G,
+                    additional_info={"note": f"Running on facebook_combined.txt with {name}",
+                                     "mode": "adaptive", "grid_index": i, "step": args.step,
+                                     "setup_time": setup_info["setup_time"]}
+                )
+
+        if args.no_influence:
+            os.replace(f"{csv_path}.tmp", csv_path)
+            continue
+
+        os.makedirs(os.path.dirname(cascade_csv_path), exist_ok=True)
+        with ExperimentLogger(f"{cascade_csv_path}.tmp", headers=CASCADE_HEADERS) as logger:
+            for row, (i, _) in enumerate(sampled):
+                budget_k, S, _, final_influence, rounds, cascade_time = evaluations[i]
+                logger.log_cascade(
+                    algorithm_name="MajorityCascade",
+                    seed_set_str=str(sorted(S)),
+                    seed_size=len(S),
+                    final_influence=final_influence,
+                    final_influence_size=len(final_influence),
+                    execution_time=cascade_time,
+                    experiment_result_row=row + 1,
+                    round=rounds,
+                    G=G,
+                    additional_info={"note": "Esecuzione Majority Cascade su facebook_combined.txt",
+                                     "mode": "adaptive", "budget": budget_k}
+                )
+
+        os.replace(f"{csv_path}.tmp", csv_path)
+        os.replace(f"{cascade_csv_path}.tmp", cascade_csv_path)
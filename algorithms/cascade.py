@@ -1,32 +1,31 @@
-import csv
-import ast
 import os
 import sys
+import csv
 import time
 import argparse
+from typing import Iterable, Optional, Tuple
 from tqdm import tqdm
+import numpy as np
 import networkx as nx
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from utils.utils import log_cascade, ceil_division  # noqa
+from utils.utils import CASCADE_HEADERS, ExperimentLogger, ceil_division  # noqa
+from utils.seed_sets import SeedSetReader, seed_set_hash  # noqa
+from utils.activation import ACTIVATION_DIR, ActivationBudgets  # noqa
+from utils.graph_arrays import CSRGraph  # noqa
 
 
 def leggi_seed_set(csv_path, i):
-    with open(csv_path, newline='') as csvfile:  # noqa
-        reader = csv.DictReader(csvfile)
-        righe = list(reader)
+    # Gestisce sia le liste complete sia i seed set codificati come delta (vedi utils.seed_sets)
+    return SeedSetReader(csv_path)[i]
 
-        if i < 0 or i >= len(righe):
-            raise IndexError(f"Indice i={i} fuori dal range valido (0-{len(righe) - 1})")
 
-        riga = righe[i]
-        seed_set_str = riga['seed_set']  # noqa
-        seed_set = set(ast.literal_eval(seed_set_str))  # noqa
-
-    return seed_set
+def leggi_budget(csv_path):
+    with open(csv_path, newline='') as csvfile:  # noqa
+        return [float(riga['budget']) for riga in csv.DictReader(csvfile)]
 
 
 def majority_cascade(G, S):  # noqa
@@ -58,6 +57,39 @@ def majority_cascade(G, S):  # noqa
     return influenced, r  # Inf[S,t]=Inf[S,t+1]
 
 
+def majority_cascade_csr(csr: CSRGraph, S: Iterable[int], stop_at: Optional[int] = None) -> Tuple[np.ndarray, int]:
+    """
+        Majority Cascade sugli array CSR, con gli stessi round di majority_cascade.
+
+        Invece di ricontare a ogni round i vicini attivi di ogni nodo, i conteggi vengono aggiornati solo
+        a partire dai nodi attivati nel round precedente. Se stop_at è specificato la cascata si interrompe
+        appena i nodi influenzati sono almeno stop_at (la cascata è monotona, quindi la soglia resta raggiunta).
+
+        Output:
+          - influenced: id dei nodi influenzati (seed compresi)
+          - r: numero di round, contato come in majority_cascade (compreso il round finale senza cambiamenti,
+            che non viene eseguito se la cascata si ferma per stop_at)
+    """
+    n = csr.num_nodes
+    half_deg = (csr.degree + 1) // 2
+    active = np.zeros(n, dtype=bool)
+    active[[csr.position(v) for v in S]] = True
+
+    count = np.bincount(csr.gather(np.flatnonzero(active)), minlength=n)
+    num_active = int(active.sum())
+    r = 1 if num_active else 0
+    while stop_at is None or num_active < stop_at:
+        new = np.flatnonzero(~active & (csr.degree > 0) & (count >= half_deg))
+        if new.size == 0:
+            break
+        r += 1
+        active[new] = True
+        num_active += new.size
+        count += np.bincount(csr.gather(new), minlength=n)
+
+    return csr.nodes[active], r
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Esecuzione Majority Cascade su esperimenti")
     parser.add_argument("--experiment_csv_path", type=str, required=True, help="Path al file CSV degli esperimenti")
@@ -65,40 +97,73 @@ if __name__ == "__main__":
                         help="Path del file CSV in cui salvare i risultati del cascade")
     parser.add_argument("--graph_path", type=str, default="../data/facebook_combined.txt",
                         help="Path al file del grafo (edgelist)")
+    parser.add_argument("--activation_budgets", action="store_true",
+                        help="Salva anche l'array nodo -> indice del primo budget di attivazione "
+                             f"in {ACTIVATION_DIR}/<nome CSV esperimenti>.npz")
     args = parser.parse_args()
 
 
     G = nx.read_edgelist("../data/facebook_combined.txt", nodetype=int)
 
-    # Numero totale di righe nel CSV degli esperimenti
-    with open(args.experiment_csv_path, 'r') as f:
-        total_rows = sum(1 for line in f) - 1  # Salta intestazione
+    # Colonna seed_set del CSV degli esperimenti, letta una sola volta
+    seed_sets = SeedSetReader(args.experiment_csv_path)
+    total_rows = len(seed_sets)
+
+    # Array nodo -> indice del primo budget di attivazione, costruito durante la sweep
+    activation = None
+    if args.activation_budgets:
+        activation = ActivationBudgets(G.nodes(), leggi_budget(args.experiment_csv_path))
+
+    # Cascate già calcolate per hash canonico del seed set: ogni seed set distinto viene simulato una volta
+    # sola e il risultato viene riportato su tutte le righe che lo contengono
+    computed = {}
 
     # Loop attraverso le righe del CSV
-    for csv_experiment_row in range(total_rows):
-        try:
-            seed_set = leggi_seed_set(args.experiment_csv_path, csv_experiment_row)
-
-            start_time = time.time()
-            final_influence, round = majority_cascade(G, seed_set)  # noqa
-            end_time = time.time()
-
-            log_cascade(
-                csv_path=args.output_csv_path,
-                algorithm_name="MajorityCascade",
-                seed_set_str=str(sorted(seed_set)),
-                seed_size=len(seed_set),
-                final_influence=final_influence,
-                final_influence_size=len(final_influence),
-                execution_time=end_time - start_time,
-                experiment_result_row=csv_experiment_row + 1,
-                round=round,
-                G=G,
-                additional_info={"note": "Esecuzione Majority Cascade su facebook_combined.txt"}
-            )
-
-            print(f"Riga {csv_experiment_row} completata. Nodi influenzati: {len(final_influence)}")
-
-        except Exception as e:
-            print(f"Errore durante l'elaborazione della riga {csv_experiment_row}: {str(e)}")
-            continue
+    with ExperimentLogger(args.output_csv_path, headers=CASCADE_HEADERS) as logger:
+        for csv_experiment_row in range(total_rows):
+            try:
+                seed_set = seed_sets[csv_experiment_row]
+                digest = seed_set_hash(seed_set)
+                additional_info = {"note": "Esecuzione Majority Cascade su facebook_combined.txt"}
+
+                start_time = time.time()
+                if digest in computed:
+                    final_influence, round, first_row = computed[digest]  # noqa
+                    additional_info["duplicate_of"] = first_row
+                else:
+                    final_influence, round = majority_cascade(G, seed_set)  # noqa
+                    computed[digest] = (final_influence, round, csv_experiment_row + 1)
+                end_time = time.time()
+
+                logger.log_cascade(
+                    algorithm_name="MajorityCascade",
+                    seed_set_str=str(sorted(seed_set)),
+                    seed_size=len(seed_set),
+                    final_influence=final_influence,
+                    final_influence_size=len(final_influence),
+                    execution_time=end_time - start_time,
+                    experiment_result_row=csv_experiment_row + 1,
+                    round=round,
+                    G=G,
+                    additional_info=additional_info
+                )
+
+                if activation is not None:
+                    activation.update(csv_experiment_row, final_influence)
+
+                print(f"Riga {csv_experiment_row} completata. Nodi influenzati: {len(final_influence)}")
+
+            except Exception as e:
+                print(f"Errore durante l'elaborazione della riga {csv_experiment_row}: {str(e)}")
+                continue
+
+    print(f"{len(computed)} seed set distinti su {total_rows} righe")
+
+    if activation is not None:
+        os.makedirs(ACTIVATION_DIR, exist_ok=True)
+        name = os.path.splitext(os.path.basename(args.experiment_csv_path))[0]
+        activation_path = os.path.join(ACTIVATION_DIR, f"{name}.npz")
+        activation.save(activation_path)
+        print(f"Array di attivazione salvato in {activation_path}")
+        if not activation.nested:
+            print("[WARN] Sweep non annidata: la curva ricavata dall'array è un limite superiore dell'influenza")
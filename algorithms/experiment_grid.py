@@ -0,0 +1,231 @@
+import os
+import sys
+import json
+import time
+import argparse
+import itertools
+import multiprocessing as mp
+from typing import Any, Dict, List, Optional, Tuple
+import networkx as nx
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.utils import assign_cost_attributes, ExperimentLogger, CASCADE_HEADERS  # noqa
+from utils.seed_sets import SeedSetDeduplicator  # noqa
+from utils.shared_graph import SharedGraph, attach_shared_graph  # noqa
+from utils.communities import load_or_compute_partition  # noqa
+from utils.smile_code import load_betweenness  # noqa
+from utils.bridges import local_bridges  # noqa
+from utils.submodular import sub_function1, sub_function2, sub_function3  # noqa
+from algorithms.seed_selectors import build_selector  # noqa
+from algorithms.cascade import majority_cascade_csr  # noqa
+
+# Configurazione di default della griglia, sovrascritta campo per campo dal file passato con --config
+DEFAULT_CONFIG = {
+    "graph_path": "../data/facebook_combined.txt",
+    # Betweenness di graph_path per SMiLe-CoDe (va cambiata insieme al grafo)
+    "betweenness_path": "./facebook_betweenness.json",
+    "output_dir": "./logs/grid",
+    "algorithms": ["CSG", "WTSS", "SMiLe-CoDe", "SMiLe-CoDe-bridges"],
+    "costs": ["cost1", "cost2", "cost3"],
+    "sub_functions": ["sub_function1", "sub_function2", "sub_function3"],
+    "step": 100,
+    "cascade": True,
+    "community_method": "louvain"
+}
+
+SUB_FUNCTIONS = {
+    "sub_function1": sub_function1,
+    "sub_function2": sub_function2,
+    "sub_function3": sub_function3
+}
+
+descriptions = {
+    "cost1": "cost1: ceiling function of degree(v) / 2",
+    "cost2": "cost2: random int in [min(cost1), max(cost1)]",
+    "cost3": "cost3: scaled log10 of betweenness centrality"
+}
+
+# Artefatti del grafo preparati una sola volta dal processo principale e passati ai worker all'avvio del pool
+_artifacts: Dict[str, Any] = {}
+
+
+def _init_worker(artifacts: Dict[str, Any], handle) -> None:
+    _artifacts.update(artifacts)
+    # Gli array CSR usati dalle cascate vengono agganciati dalla memoria condivisa, senza copie
+    _artifacts["csr"], _ = attach_shared_graph(handle)
+
+
+def load_grid_betweenness(G: nx.Graph, betweenness_path: str) -> Dict[int, float]:  # noqa
+    """Betweenness di config["betweenness_path"], verificando che si riferisca ai nodi del grafo della griglia."""
+    betweenness = load_betweenness(betweenness_path)
+    if betweenness.keys() != set(G.nodes()):
+        raise ValueError(f"{betweenness_path} non corrisponde al grafo della griglia: "
+                         f"{len(betweenness)} nodi contro {G.number_of_nodes()}, o id diversi")
+    return betweenness
+
+
+def expand_grid(config: Dict[str, Any]) -> List[Tuple[str, str, Optional[str]]]:
+    """
+        Job (algoritmo, costo, funzione submodulare) della griglia. La funzione submodulare conta solo
+        per CSG: per gli altri algoritmi il job è unico per costo e la funzione è None.
+    """
+    jobs = []
+    for algorithm, cost_name in itertools.product(config["algorithms"], config["costs"]):
+        if algorithm == "CSG":
+            jobs.extend((algorithm, cost_name, sub) for sub in config["sub_functions"])
+        else:
+            jobs.append((algorithm, cost_name, None))
+    return jobs
+
+
+def job_name(job: Tuple[str, str, Optional[str]]) -> str:
+    algorithm, cost_name, sub = job
+    return f"{cost_name}_{algorithm}" + (f"_{sub}" if sub else "")
+
+
+def job_done(job: Tuple[str, str, Optional[str]], config: Dict[str, Any]) -> bool:
+    """Un job è completato se esistono i suoi log definitivi (con cascade anche quello delle cascate)."""
+    name = job_name(job)
+    paths = [os.path.join(config["output_dir"], f"{name}.csv")]
+    if config["cascade"]:
+        paths.append(os.path.join(config["output_dir"], "cascade_results", f"{name}_results.csv"))
+    return all(os.path.exists(path) for path in paths)
+
+
+def run_job(job: Tuple[str, str, Optional[str]]) -> Dict[str, Any]:
+    """
+        Sweep completa di un job nel processo worker: selezione per tutti i budget della griglia a passo
+        fisso e, se richiesto, Majority Cascade di ogni seed set distinto. I log del job vengono scritti in
+        output_dir/<job>.csv e output_dir/cascade_results/<job>_results.csv; durante il job hanno suffisso
+        .tmp e vengono rinominati solo alla fine, quindi un log presente indica sempre un job completato.
+    """
+    algorithm, cost_name, sub = job
+    G, config = _artifacts["G"], _artifacts["config"]  # noqa
+    cost = nx.get_node_attributes(G, cost_name)
+    name = job_name(job)
+    start_time = time.time()
+
+    min_budget = int(max(cost.values()))
+    max_budget = int(sum(cost.values()))
+    if min_budget > max_budget:
+        min_budget, max_budget = max_budget, min_budget
+    budgets = range(min_budget, max_budget + 1, config["step"])
+
+    setup_info = {}
+    selector = build_selector(G, algorithm, cost_name, setup_info=setup_info,
+                              sub_function=SUB_FUNCTIONS[sub] if sub else sub_function1,
+                              partition=_artifacts["partition"], betweenness=_artifacts["betweenness"],
+                              bridges=_artifacts["bridges"])
+
+    csv_path = os.path.join(config["output_dir"], f"{name}.csv")
+    cascade_csv_path = os.path.join(config["output_dir"], "cascade_results", f"{name}_results.csv")
+    for path in (csv_path, cascade_csv_path):
+        if os.path.exists(f"{path}.tmp"):
+            os.remove(f"{path}.tmp")  # residuo di un'esecuzione interrotta
+
+    rows = []
+    with ExperimentLogger(f"{csv_path}.tmp", dedup=True) as logger:
+        for budget_k in budgets:
+            selection_start = time.time()
+            S = selector(budget_k)
+            exec_time = time.time() - selection_start
+            rows.append(S)
+            logger.log_experiment(
+                algorithm_name=f"{algorithm}-{sub}" if sub else algorithm,
+                cost_function=descriptions[cost_name],
+                use_threshold=algorithm == "WTSS",
+                budget=budget_k,
+                seed_set=S,
+                total_cost=sum(cost[v] for v in S),
+                execution_time=exec_time,
+                G=G,
+                additional_info={"note": f"Running on {os.path.basename(config['graph_path'])} with {cost_name}",
+                                 "mode": "grid", "sub_function": sub, "setup_time": setup_info["setup_time"]}
+            )
+
+    if config["cascade"]:
+        csr = _artifacts["csr"]
+        dedup = SeedSetDeduplicator()
+        results = []
+        with ExperimentLogger(f"{cascade_csv_path}.tmp", headers=CASCADE_HEADERS) as logger:
+            for csv_experiment_row, S in enumerate(rows):
+                additional_info = {"note": "Esecuzione Majority Cascade", "mode": "grid"}
+                cascade_start = time.time()
+                _, first_row = dedup.add(S)
+                if first_row is not None:
+                    final_influence, rounds = results[first_row]
+                    additional_info["duplicate_of"] = first_row + 1
+                else:
+                    influenced, rounds = majority_cascade_csr(csr, S)
+                    final_influence = influenced.tolist()
+                results.append((final_influence, rounds))
+                logger.log_cascade(
+                    algorithm_name="MajorityCascade",
+                    seed_set_str=str(sorted(S)),
+                    seed_size=len(S),
+                    final_influence=final_influence,
+                    final_influence_size=len(final_influence),
+                    execution_time=time.time() - cascade_start,
+                    experiment_result_row=csv_experiment_row + 1,
+                    round=rounds,
+                    G=G,
+                    additional_info=additional_info
+                )
+
+        os.replace(f"{cascade_csv_path}.tmp", cascade_csv_path)
+    os.replace(f"{csv_path}.tmp", csv_path)
+
+    return {"job": name, "budgets": len(rows), "time": time.time() - start_time, "pid": os.getpid()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Griglia di esperimenti (algoritmi x costi x funzioni submodulari) "
+                                                 "su un pool di processi")
+    parser.add_argument("--config", type=str, default=None,
+                        help="File JSON con i campi da sovrascrivere in DEFAULT_CONFIG (es. experiment_grid.json)")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Numero di job in parallelo (default: tutti i core, al massimo il numero di job)")
+    parser.add_argument("--dry_run", action="store_true",
+                        help="Mostra solo i job della griglia senza eseguirli")
+    args = parser.parse_args()
+
+    config = dict(DEFAULT_CONFIG)
+    if args.config:
+        with open(args.config, "r") as f:
+            config.update(json.load(f))
+
+    jobs = expand_grid(config)
+    # I job già completati (log presenti) non vengono rieseguiti
+    pending = [job for job in jobs if not job_done(job, config)]
+    for job in jobs:
+        print(f"{job_name(job)}{'' if job in pending else ' (already done, skipped)'}")
+    if args.dry_run or not pending:
+        sys.exit(0)
+
+    # Grafo, costi, betweenness, partizione e local bridge: calcolati una volta, condivisi da tutti i job
+    G = nx.read_edgelist(config["graph_path"], nodetype=int)
+    G, cost1, cost2, cost3, threshold = assign_cost_attributes(G, use_threshold=True)
+    algorithms = {algorithm for algorithm, _, _ in pending}
+    smile = bool(algorithms & {"SMiLe-CoDe", "SMiLe-CoDe-bridges"})
+    artifacts = {
+        "G": G,
+        "config": config,
+        "betweenness": load_grid_betweenness(G, config["betweenness_path"]) if smile else None,
+        "partition": load_or_compute_partition(G, method=config["community_method"]) if smile else None,
+        "bridges": local_bridges(G, with_span=False) if "SMiLe-CoDe-bridges" in algorithms else None
+    }
+
+    os.makedirs(os.path.join(config["output_dir"], "cascade_results"), exist_ok=True)
+    processes = min(args.processes or mp.cpu_count(), len(pending))
+    print(f"\nRunning {len(pending)} jobs on {processes} processes")
+
+    start_time = time.time()
+    with SharedGraph.from_networkx(G) as shared, \
+            mp.Pool(processes, initializer=_init_worker, initargs=(artifacts, shared.handle)) as pool:
+        for summary in pool.imap_unordered(run_job, pending):
+            print(f"{summary['job']}: {summary['budgets']} budgets in {summary['time']:.2f} seconds "
+                  f"(pid {summary['pid']})")
+    print(f"Grid completed in {time.time() - start_time:.2f} seconds")
@@ -0,0 +1,109 @@
+import os
+import sys
+import math
+import time
+import argparse
+from typing import Any, Callable, Dict, List, Optional, Set
+import networkx as nx
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.utils import assign_cost_attributes  # noqa
+from utils.adaptive import gallop_search  # noqa
+from utils.communities import COMMUNITY_BACKENDS  # noqa
+from utils.graph_arrays import CSRGraph  # noqa
+from algorithms.seed_selectors import build_selector, SELECTOR_ALGORITHMS  # noqa
+from algorithms.cascade import majority_cascade_csr  # noqa
+
+
+def min_budget_for_coverage(G: nx.Graph, selector: Callable[[float], Set[int]], coverage: float,  # noqa
+                            max_budget: float, step: int = 1, breakpoints: Optional[List[float]] = None,
+                            csr: Optional[CSRGraph] = None) -> Optional[Dict[str, Any]]:
+    """
+        Budget minimo il cui seed set influenza almeno coverage * |V| nodi con la Majority Cascade.
+
+        I budget candidati sono i breakpoints del selettore, se disponibili (per CSG i costi cumulativi della
+        traiettoria: il risultato è esattamente il costo del prefisso più corto che raggiunge la copertura),
+        altrimenti la griglia 0, step, 2*step, ... fino a max_budget. La ricerca è galoppante e poi binaria
+        (utils.adaptive.gallop_search), quindi servono O(log range) selezioni e cascate; ogni cascata si
+        ferma appena raggiunge la soglia.
+
+        La ricerca assume che l'influenza sia non decrescente nel budget: se non lo è (WTSS, SMiLe-CoDe
+        possono avere oscillazioni) il budget restituito raggiunge la copertura e il candidato precedente
+        valutato no, ma un budget più piccolo non valutato potrebbe raggiungerla.
+
+        Returns:
+            Dizionario con budget, seed_set, final_influence_size (cascata completa), probes (numero di
+            cascate della ricerca), oppure None se nemmeno il budget massimo raggiunge la copertura
+    """
+    if csr is None:
+        csr = CSRGraph.from_networkx(G)
+    target = math.ceil(coverage * csr.num_nodes)
+
+    # Con la griglia i budget candidati non vengono materializzati: il budget i-esimo è i * step
+    if breakpoints is not None:
+        candidates = [0] + list(breakpoints)
+        budget_of, num_points = candidates.__getitem__, len(candidates)
+    else:
+        budget_of, num_points = lambda i: i * step, int(math.ceil(max_budget)) // step + 1
+
+    probes = {}
+
+    def covers(i):
+        S = selector(budget_of(i))
+        influenced, _ = majority_cascade_csr(csr, S, stop_at=target)
+        probes[i] = (S, len(influenced))
+        return len(influenced) >= target
+
+    index = gallop_search(covers, num_points)
+    if index is None:
+        return None
+
+    S = probes[index][0]
+    final_influence, rounds = majority_cascade_csr(csr, S)
+    return {
+        "budget": budget_of(index),
+        "seed_set": S,
+        "final_influence_size": len(final_influence),
+        "rounds": rounds,
+        "probes": len(probes)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Budget minimo per raggiungere una copertura su facebook_combined.txt")
+    parser.add_argument("--algorithm", type=str, choices=SELECTOR_ALGORITHMS, required=True,
+                        help="Algoritmo di selezione dei seed")
+    parser.add_argument("--cost", type=str, choices=["cost1", "cost2", "cost3"], required=True,
+                        help="Funzione di costo dei nodi")
+    parser.add_argument("--coverage", type=float, required=True,
+                        help="Frazione dei nodi da influenzare (es. 0.5 per il 50%%)")
+    parser.add_argument("--step", type=int, default=1,
+                        help="Granularità dei budget candidati (ignorata per CSG, che usa i costi della traiettoria)")
+    parser.add_argument("--community_method", type=str, choices=sorted(COMMUNITY_BACKENDS), default="louvain",
+                        help="Backend di community detection per SMiLe-CoDe (vedi utils.communities)")
+    args = parser.parse_args()
+
+    G = nx.read_edgelist("../data/facebook_combined.txt", nodetype=int)
+    G, cost1, cost2, cost3, threshold = assign_cost_attributes(G, use_threshold=True)
+    cost = {"cost1": cost1, "cost2": cost2, "cost3": cost3}[args.cost]
+
+    setup_info = {}
+    selector = build_selector(G, args.algorithm, args.cost, community_method=args.community_method,
+                              setup_info=setup_info)
+
+    start_time = time.time()
+    result = min_budget_for_coverage(G, selector, args.coverage, sum(cost.values()), args.step,
+                                     breakpoints=setup_info.get("breakpoints"))
+    query_time = time.time() - start_time
+
+    print(f"\n{args.algorithm} | {args.cost} | coverage {args.coverage:.2%} of {G.number_of_nodes()} nodes")
+    if result is None:
+        print("Coverage not reachable within the total cost of the graph.")
+    else:
+        print(f"Minimum budget: {result['budget']}")
+        print(f"Seed set size: {len(result['seed_set'])} | Total cost: {sum(cost[v] for v in result['seed_set'])}")
+        print(f"Final influence: {result['final_influence_size']} nodes in {result['rounds']} rounds")
+        print(f"Probes: {result['probes']} | Setup: {setup_info['setup_time']:.2f}s | Query: {query_time:.2f}s")
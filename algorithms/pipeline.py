@@ -0,0 +1,210 @@
+import os
+import sys
+import time
+import queue
+import argparse
+import threading
+import multiprocessing as mp
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+import networkx as nx
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.utils import assign_cost_attributes, ExperimentLogger, CASCADE_HEADERS  # noqa
+from utils.seed_sets import SeedSetDeduplicator  # noqa
+from utils.communities import COMMUNITY_BACKENDS  # noqa
+from utils.shared_graph import SharedGraph, attach_shared_graph  # noqa
+from algorithms.seed_selectors import build_selector, SELECTOR_ALGORITHMS  # noqa
+from algorithms.cascade import majority_cascade_csr  # noqa
+
+# Grafo CSR in memoria condivisa, agganciato una sola volta per processo worker dall'initializer del pool
+_worker_csr = {}
+
+
+def _init_worker(handle) -> None:
+    _worker_csr["csr"], _ = attach_shared_graph(handle)
+
+
+def _cascade_task(row: int, seed_set: List[int]):
+    start_time = time.time()
+    influenced, rounds = majority_cascade_csr(_worker_csr["csr"], seed_set)
+    return row, influenced.tolist(), rounds, time.time() - start_time
+
+
+def run_pipeline(G: nx.Graph, selector: Callable[[float], Set[int]], budgets: Sequence[float],  # noqa
+                 processes: Optional[int] = None, queue_size: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+        Selezione e Majority Cascade di una sweep nello stesso processo, senza passare dai CSV.
+
+        Un thread produttore calcola i seed set dei budget in ordine e li mette in una coda limitata
+        (queue_size); il thread principale li consuma e invia le cascate a un pool di processi, che agganciano
+        gli array CSR del grafo in memoria condivisa (utils.shared_graph) senza copie. Così la selezione del
+        budget k+1 si sovrappone alla cascata del budget k, e al massimo queue_size selezioni e queue_size
+        cascate sono in attesa.
+        I seed set già visti (utils.seed_sets.SeedSetDeduplicator) non vengono rimandati al pool: il risultato
+        della prima occorrenza viene riportato sulle righe duplicate.
+
+        Returns:
+            Una riga per budget, in ordine: budget, seed_set, selection_time, final_influence, round,
+            cascade_time ed eventualmente duplicate_of (indice 0-based della prima riga con lo stesso seed set)
+    """
+    processes = processes or mp.cpu_count()
+    queue_size = queue_size or 2 * processes
+
+    selections: queue.Queue = queue.Queue(maxsize=queue_size)
+    errors: List[BaseException] = []
+
+    def produce():
+        try:
+            for row, budget in enumerate(budgets):
+                start_time = time.time()
+                S = selector(budget)
+                selections.put((row, budget, sorted(S), time.time() - start_time))
+        except BaseException as e:  # noqa
+            errors.append(e)
+        finally:
+            selections.put(None)
+
+    producer = threading.Thread(target=produce, daemon=True)
+
+    results: Dict[int, Dict[str, Any]] = {}
+    dedup = SeedSetDeduplicator()
+    slots = threading.Semaphore(queue_size)
+    release = lambda _: slots.release()  # noqa
+
+    with SharedGraph.from_networkx(G) as shared, \
+            mp.Pool(processes, initializer=_init_worker, initargs=(shared.handle,)) as pool:
+        # Il produttore parte solo dopo il fork dei worker: un thread attivo durante il fork può lasciare
+        # lock acquisiti nei processi figli
+        producer.start()
+        pending = []
+        for row, budget, S, selection_time in iter(selections.get, None):
+            results[row] = {"budget": budget, "seed_set": S, "selection_time": selection_time}
+            _, first_row = dedup.add(S)
+            if first_row is not None:
+                results[row]["duplicate_of"] = first_row
+                continue
+            slots.acquire()
+            pending.append(pool.apply_async(_cascade_task, (row, S), callback=release, error_callback=release))
+
+        for task in pending:
+            row, final_influence, rounds, cascade_time = task.get()
+            results[row].update(final_influence=final_influence, round=rounds, cascade_time=cascade_time)
+
+    producer.join()
+    if errors:
+        raise errors[0]
+
+    rows = [results[row] for row in range(len(results))]
+    for row in rows:
+        if "duplicate_of" in row:
+            first = rows[row["duplicate_of"]]
+            row.update(final_influence=first["final_influence"], round=first["round"], cascade_time=0.0)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Selezione e Majority Cascade in un unico processo "
+                                                 "su facebook_combined.txt")
+    parser.add_argument("--algorithm", type=str, choices=SELECTOR_ALGORITHMS, required=True,
+                        help="Algoritmo di selezione dei seed")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Numero di processi per le cascate (default: tutti i core)")
+    parser.add_argument("--queue_size", type=int, default=None,
+                        help="Numero massimo di seed set in attesa di cascata (default: 2 * processes)")
+    parser.add_argument("--step", type=int, default=100,
+                        help="Passo della sweep sui budget")
+    parser.add_argument("--community_method", type=str, choices=sorted(COMMUNITY_BACKENDS), default="louvain",
+                        help="Backend di community detection per SMiLe-CoDe (vedi utils.communities)")
+    args = parser.parse_args()
+
+    G = nx.read_edgelist("../data/facebook_combined.txt", nodetype=int)
+    G, cost1, cost2, cost3, threshold = assign_cost_attributes(G, use_threshold=True)
+
+    # Configurazioni funzioni di costo e relative descrizioni
+    cost_functions = {
+        "cost1": cost1,
+        "cost2": cost2,
+        "cost3": cost3
+    }
+
+    descriptions = {
+        "cost1": "cost1: ceiling function of degree(v) / 2",
+        "cost2": "cost2: random int in [min(cost1), max(cost1)]",
+        "cost3": "cost3: scaled log10 of betweenness centrality"
+    }
+
+    for name, cost in cost_functions.items():
+        algorithm_name = args.algorithm
+        cost_function_desc = descriptions[name]
+
+        # Calcolo range del budget
+        min_budget = int(max(cost.values()))
+        max_budget = int(sum(cost.values()))
+        if min_budget > max_budget:
+            print(f"MinBudget > MaxBudget for {name}")
+            min_budget, max_budget = max_budget, min_budget
+
+        if min_budget == max_budget:
+            print(f"MinBudget = MaxBudget for {name}")
+            continue
+
+        budgets = list(range(min_budget, max_budget + 1, args.step))
+        print(f"\n{name} — budget from {min_budget} to {max_budget} ({len(budgets)} budgets)")
+
+        setup_info = {}
+        selector = build_selector(G, args.algorithm, name, community_method=args.community_method,
+                                  setup_info=setup_info)
+
+        start_time = time.time()
+        rows = run_pipeline(G, selector, budgets, args.processes, args.queue_size)
+        pipeline_time = time.time() - start_time
+        distinct = sum("duplicate_of" not in row for row in rows)
+        print(f"{name}: {len(rows)} budgets, {distinct} distinct seed sets in {pipeline_time:.2f} seconds")
+
+        # Entrambi i log vengono scritti alla fine, nello stesso ordine dei budget, e sostituiscono quelli di
+        # un'esecuzione precedente: experiment_result_row e duplicate_of si riferiscono solo a questa sweep
+        csv_path = f"./logs/{name}_{args.algorithm}_pipeline.csv"
+        cascade_csv_path = f"./logs/cascade_results/{name}_{args.algorithm}_pipeline_results.csv"
+        for path in (csv_path, cascade_csv_path):
+            if os.path.exists(f"{path}.tmp"):
+                os.remove(f"{path}.tmp")  # residuo di un'esecuzione interrotta
+
+        with ExperimentLogger(f"{csv_path}.tmp", dedup=True) as logger:
+            for row in rows:
+                logger.log_experiment(
+                    algorithm_name=algorithm_name,
+                    cost_function=cost_function_desc,
+                    use_threshold=args.algorithm == "WTSS",
+                    budget=row["budget"],
+                    seed_set=row["seed_set"],
+                    total_cost=sum(cost[v] for v in row["seed_set"]),
+                    execution_time=row["selection_time"],
+                    G=G,
+                    additional_info={"note": f"Running on facebook_combined.txt with {name}",
+                                     "mode": "pipeline", "setup_time": setup_info["setup_time"]}
+                )
+
+        os.makedirs(os.path.dirname(cascade_csv_path), exist_ok=True)
+        with ExperimentLogger(f"{cascade_csv_path}.tmp", headers=CASCADE_HEADERS) as logger:
+            for csv_experiment_row, row in enumerate(rows):
+                additional_info = {"note": "Esecuzione Majority Cascade su facebook_combined.txt", "mode": "pipeline"}
+                if "duplicate_of" in row:
+                    additional_info["duplicate_of"] = row["duplicate_of"] + 1
+                logger.log_cascade(
+                    algorithm_name="MajorityCascade",
+                    seed_set_str=str(row["seed_set"]),
+                    seed_size=len(row["seed_set"]),
+                    final_influence=row["final_influence"],
+                    final_influence_size=len(row["final_influence"]),
+                    execution_time=row["cascade_time"],
+                    experiment_result_row=csv_experiment_row + 1,
+                    round=row["round"],
+                    G=G,
+                    additional_info=additional_info
+                )
+
+        os.replace(f"{csv_path}.tmp", csv_path)
+        os.replace(f"{cascade_csv_path}.tmp", cascade_csv_path)
@@ -0,0 +1,52 @@
+import os
+import sys
+import argparse
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.results_store import RESULTS_DB, ResultsStore  # noqa
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archivio SQLite dei risultati (esperimenti e cascate)")
+    parser.add_argument("--db_path", type=str, default=RESULTS_DB, help="Path del database SQLite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Importa i CSV di logs/ e logs/cascade_results/")
+    import_parser.add_argument("--logs_dir", type=str, default="./logs", help="Directory dei CSV")
+
+    export_parser = subparsers.add_parser("export", help="Esporta un algoritmo/costo nel formato CSV attuale")
+    export_parser.add_argument("--algorithm", type=str, required=True,
+                               help="Algoritmo come nel nome del log cost{N}_{algo}.csv (es. SMiLe-CoDe o WTSS_pipeline)")
+    export_parser.add_argument("--cost", type=int, choices=[1, 2, 3], required=True, help="ID della funzione di costo")
+    export_parser.add_argument("--output_dir", type=str, default="./logs/export", help="Directory di output")
+
+    query_parser = subparsers.add_parser("query", help="Run di un algoritmo/costo in un intervallo di budget")
+    query_parser.add_argument("--algorithm", type=str, required=True,
+                               help="Algoritmo come nel nome del log cost{N}_{algo}.csv (es. SMiLe-CoDe o WTSS_pipeline)")
+    query_parser.add_argument("--cost", type=int, choices=[1, 2, 3], required=True, help="ID della funzione di costo")
+    query_parser.add_argument("--min_budget", type=float, default=None, help="Budget minimo (incluso)")
+    query_parser.add_argument("--max_budget", type=float, default=None, help="Budget massimo (incluso)")
+    args = parser.parse_args()
+
+    with ResultsStore(args.db_path) as store:
+        if args.command == "import":
+            for name, count in store.import_logs(args.logs_dir).items():
+                print(f"{name}: {count} righe importate")
+
+        elif args.command == "export":
+            prefix = f"cost{args.cost}_{args.algorithm}"
+            os.makedirs(os.path.join(args.output_dir, "cascade_results"), exist_ok=True)
+            runs = store.export_experiment_csv(os.path.join(args.output_dir, f"{prefix}.csv"),
+                                               args.algorithm, f"cost{args.cost}")
+            cascades = store.export_cascade_csv(os.path.join(args.output_dir, "cascade_results",
+                                                             f"{prefix}_results.csv"),
+                                                args.algorithm, f"cost{args.cost}")
+            print(f"{prefix}: {runs} esperimenti e {cascades} cascate esportati in {args.output_dir}")
+
+        else:
+            for run in store.query_runs(args.algorithm, f"cost{args.cost}", args.min_budget, args.max_budget):
+                print(f"Budget: {run['budget']} | Seeds: {run['num_seeds']} | Total cost: {run['total_cost']} | "
+                      f"Time: {run['execution_time']:.2f}s")
@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+import networkx as nx
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.communities import load_or_compute_partition  # noqa
+from utils.smile_code import SelectionContext, load_betweenness  # noqa
+from utils.bridges import BRIDGE_FILE, load_local_bridges  # noqa
+from utils.submodular import sub_function1  # noqa
+from algorithms.CSG_new import cost_seeds_greedy_trajectories, seed_set_from_trajectory  # noqa
+from algorithms.WTSS import WTSS_event_log, WTSS_replay  # noqa
+
+# Algoritmi per cui build_selector sa costruire una funzione budget -> seed set
+SELECTOR_ALGORITHMS = ["CSG", "WTSS", "SMiLe-CoDe", "SMiLe-CoDe-bridges"]
+
+
+def build_selector(G: nx.Graph, algorithm: str, cost_attr: str,  # noqa
+                   centrality_file: str = "./facebook_betweenness.json",
+                   bridges_file: str = BRIDGE_FILE,
+                   community_method: str = "louvain",
+                   setup_info: Dict = None,
+                   sub_function: Callable = sub_function1,
+                   partition: Optional[Dict[int, int]] = None,
+                   betweenness: Optional[Dict[int, float]] = None,
+                   bridges: Optional[Iterable[Tuple]] = None) -> Callable[[float], Set[int]]:
+    """
+        Funzione budget -> seed set di un algoritmo, con tutta la parte indipendente dal budget calcolata una
+        sola volta, così i budget possono essere valutati in qualsiasi ordine:
+          - CSG: traiettoria greedy (CSG_new), il seed set è il prefisso che rientra nel budget
+            (identico alla sweep con warm start)
+          - WTSS: log degli eventi del Case 2, il seed set si ricostruisce con WTSS_replay
+          - SMiLe-CoDe / SMiLe-CoDe-bridges: SelectionContext sulla partizione in cache
+
+        G deve avere gli attributi di costo (e "threshold" per WTSS) assegnati da assign_cost_attributes.
+        sub_function è la funzione submodulare di CSG. partition, betweenness e bridges permettono di
+        riusare artefatti già calcolati (es. condivisi tra i job di experiment_grid.py); se assenti vengono caricati
+        dalle cache su disco (centrality_file, bridges_file, partizioni) o calcolati qui.
+        Se setup_info è un dizionario, vi viene scritto il tempo di preparazione ("setup_time") e, per CSG,
+        i costi cumulativi della traiettoria ("breakpoints"): gli unici budget in cui il seed set cambia.
+    """
+    start_time = time.time()
+    cost = nx.get_node_attributes(G, cost_attr)
+
+    if algorithm == "CSG":
+        trajectory = cost_seeds_greedy_trajectories(G, [cost_attr], sub_function)[cost_attr]
+        selector = lambda budget: seed_set_from_trajectory(trajectory, budget)  # noqa
+        if setup_info is not None:
+            setup_info["breakpoints"] = [c for _, c in trajectory]
+
+    elif algorithm == "WTSS":
+        threshold = nx.get_node_attributes(G, "threshold")
+        events, cutoffs = WTSS_event_log(G, threshold, cost)
+        selector = lambda budget: set(WTSS_replay(events, cost, budget, cutoffs))  # noqa
+
+    elif algorithm in ("SMiLe-CoDe", "SMiLe-CoDe-bridges"):
+        if partition is None:
+            partition = load_or_compute_partition(G, method=community_method)
+        if betweenness is None:
+            betweenness = load_betweenness(centrality_file)
+        if algorithm != "SMiLe-CoDe-bridges":
+            bridges = None
+        elif bridges is None:
+            bridges = load_local_bridges(G, bridges_file)
+        context = SelectionContext(G, cost_attr, partition, betweenness, bridges)
+        selector = lambda budget: set(context.query(budget))  # noqa
+
+    else:
+        raise ValueError(f"Algoritmo non supportato: {algorithm}")
+
+    if setup_info is not None:
+        setup_info["setup_time"] = time.time() - start_time
+    return selector
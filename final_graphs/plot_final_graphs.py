@@ -9,6 +9,9 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from utils.results_store import ResultsStore  # noqa
+from utils.activation import influence_curve, load_activation  # noqa
+
 # Directory output per le immagini
 PLOTS_DIR = os.path.join(project_root, "final_graphs", "plots")
 os.makedirs(PLOTS_DIR, exist_ok=True)
@@ -27,6 +30,8 @@ COST_HEADERS = [
 ]
 
 RESULTS_TEMPLATE = "../algorithms/logs/cascade_results/cost{cost}_{algo}_results.csv"
+RESULTS_DB = "../algorithms/logs/results.db"
+ACTIVATION_TEMPLATE = "../algorithms/logs/activation/cost{cost}_{algo}.npz"
 COST_TEMPLATE = "../algorithms/logs/cost{cost}_{algo}.csv"
 
 CHUNKSIZE = 50000  # per la lettura in chunk
@@ -96,6 +101,66 @@ def load_costs(algorithm=None, cost=None):
     return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
 
 
+def load_from_store(db_path, algorithm=None, cost=None):
+    """Esperimenti e cascate già uniti, letti dall'archivio SQLite con una query indicizzata per coppia."""
+    if algorithm and cost:
+        pairs = [(algorithm, cost)]
+    elif algorithm:
+        pairs = [(algorithm, c) for c in [1, 2, 3]]
+    elif cost:
+        algos = ["CSG", "WTSS", "SMiLe-CoDe", "SMiLe-CoDe-bridges"]
+        pairs = [(a, cost) for a in algos]
+    else:
+        raise ValueError("Devi specificare almeno --algorithm o --cost")
+
+    dfs = []
+    with ResultsStore(db_path) as store:
+        for algo, c in pairs:
+            rows = store.query_cascades(algo, f"cost{c}")
+            if not rows:
+                print(f"[WARN] Nessun risultato nel database per {algo} cost{c}", file=sys.stderr)
+                continue
+            df = pd.DataFrame(rows)[["run_id", "budget", "num_seeds", "cost_function",
+                                     "final_influence_size", "execution_time"]]
+            df = df.rename(columns={"run_id": "experiment_result_row"})
+            df['algorithm'] = algo
+            df['cost'] = c
+            dfs.append(df)
+
+    return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+
+
+def load_activation_curves(algorithm=None, cost=None):
+    """Curve budget-influenza ricavate dagli array di attivazione (istogramma cumulativo), una per coppia."""
+    if algorithm and cost:
+        pairs = [(algorithm, cost)]
+    elif algorithm:
+        pairs = [(algorithm, c) for c in [1, 2, 3]]
+    elif cost:
+        algos = ["CSG", "WTSS", "SMiLe-CoDe", "SMiLe-CoDe-bridges"]
+        pairs = [(a, cost) for a in algos]
+    else:
+        raise ValueError("Devi specificare almeno --algorithm o --cost")
+
+    dfs = []
+    for algo, c in pairs:
+        path = ACTIVATION_TEMPLATE.format(cost=c, algo=algo)
+        if not os.path.exists(path):
+            print(f"[WARN] Array di attivazione non trovato: {path}", file=sys.stderr)
+            continue
+        _, activation, budgets, nested = load_activation(path)
+        if not nested:
+            print(f"[WARN] Sweep non annidata per {algo} cost{c}: la curva è un limite superiore", file=sys.stderr)
+        dfs.append(pd.DataFrame({
+            "budget": budgets,
+            "final_influence_size": influence_curve(activation, len(budgets)),
+            "algorithm": algo,
+            "cost": c
+        }))
+
+    return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+
+
 def plot_budget_vs_influence(df, title, save_path):
     """
         Crea un plot con una o più serie in base ai parametri:
@@ -372,6 +437,12 @@ def main():
                         help="Algoritmo da caricare")
     parser.add_argument("--cost", type=int, choices=[1, 2, 3],
                         help="ID della funzione di costo (1,2,3)")
+    parser.add_argument("--db", type=str, nargs="?", const=RESULTS_DB, default=None,
+                        help="Legge i risultati dall'archivio SQLite (vedi algorithms/results_db.py) "
+                             "invece che dai CSV")
+    parser.add_argument("--activation", action="store_true",
+                        help="Disegna le curve di influenza dagli array di attivazione di cascade.py "
+                             "(--activation_budgets), senza leggere le liste final_influence")
     args = parser.parse_args()
 
     # Validazione input
@@ -379,19 +450,28 @@ def main():
         parser.error("Specificare almeno un algoritmo o una funzione di costo")
 
     try:
-        df_res = load_results(algorithm=args.algorithm, cost=args.cost)
-        df_costs = load_costs(algorithm=args.algorithm, cost=args.cost)
+        if args.activation:
+            df = load_activation_curves(algorithm=args.algorithm, cost=args.cost)
+            if df.empty:
+                raise ValueError("Nessun array di attivazione disponibile per i parametri richiesti")
+        elif args.db:
+            df = load_from_store(args.db, algorithm=args.algorithm, cost=args.cost)
+            if df.empty:
+                raise ValueError("Nessun dato disponibile per i parametri richiesti")
+        else:
+            df_res = load_results(algorithm=args.algorithm, cost=args.cost)
+            df_costs = load_costs(algorithm=args.algorithm, cost=args.cost)
 
-        if df_res.empty or df_costs.empty:
-            raise ValueError("Nessun dato disponibile per i parametri richiesti")
+            if df_res.empty or df_costs.empty:
+                raise ValueError("Nessun dato disponibile per i parametri richiesti")
 
-        # Unione dei dataframe
-        df = pd.merge(
-            df_costs,
-            df_res,
-            on=["experiment_result_row", "algorithm", "cost"],
-            how="inner"
-        ).drop_duplicates()
+            # Unione dei dataframe
+            df = pd.merge(
+                df_costs,
+                df_res,
+                on=["experiment_result_row", "algorithm", "cost"],
+                how="inner"
+            ).drop_duplicates()
 
         '''
         # DEBUG VALORE ANOMALO WTSS Cost2
@@ -424,6 +504,10 @@ def main():
 
         plot_budget_vs_influence(df, title, save_path)
 
+        # Gli array di attivazione contengono solo la curva di influenza
+        if args.activation:
+            return
+
         base_name = ""
         title = ""
         if args.algorithm:
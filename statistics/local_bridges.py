@@ -1,15 +1,36 @@
+import os
+import sys
+import argparse
 import networkx as nx
 
-G = nx.read_edgelist("../data/facebook_combined.txt", nodetype=int)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
-local_bridges = nx.local_bridges(G)
-set_LB = set(local_bridges)
-print("Numero di local bridge nella rete: ", len(set_LB))
-print("Numero di bridge nella rete: ", sum(1 for e in set_LB if e[2] == float('inf')))
+from utils.bridges import local_bridges  # noqa
 
-# Salvataggio edge list del grafo senza i bridge
-G_removed = G.copy()
-for t in set_LB:
-    G_removed.remove_edge(t[0], t[1])
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local bridge di facebook_combined.txt")
+    parser.add_argument("--processes", type=int, default=None, help="Dimensione del pool di processi")
+    parser.add_argument("--max_span", type=int, default=None,
+                        help="Profondità massima della BFS per lo span; gli span maggiori risultano None e non "
+                             "vengono contati tra i bridge (default: nessun limite)")
+    args = parser.parse_args()
 
-nx.write_edgelist(G_removed, "../data/no_bridge.txt")
\ No newline at end of file
+    G = nx.read_edgelist("../data/facebook_combined.txt", nodetype=int)
+
+    set_LB = set(local_bridges(G, max_span=args.max_span, processes=args.processes))
+    print("Numero di local bridge nella rete: ", len(set_LB))
+    if args.max_span is None:
+        print("Numero di bridge nella rete: ", sum(1 for e in set_LB if e[2] == float('inf')))
+    else:
+        # Con la BFS limitata i bridge non sono distinguibili dagli span oltre max_span (None)
+        print(f"Local bridge con span oltre {args.max_span}: ", sum(1 for e in set_LB if e[2] is None))
+        print("Numero di bridge nella rete: ", sum(1 for _ in nx.bridges(G)))
+
+    # Salvataggio edge list del grafo senza i bridge
+    G_removed = G.copy()
+    for t in set_LB:
+        G_removed.remove_edge(t[0], t[1])
+
+    nx.write_edgelist(G_removed, "../data/no_bridge.txt")
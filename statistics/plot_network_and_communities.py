@@ -1,13 +1,22 @@
 import os
 import sys
+import argparse
 import networkx as nx
 import matplotlib.pyplot as plt
-import community as community_louvain  # noqa
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from utils.communities import COMMUNITY_BACKENDS, compare_backends, load_or_compute_partition  # noqa
+
+parser = argparse.ArgumentParser(description="Plot della rete e delle sue comunità")
+parser.add_argument("--method", type=str, choices=sorted(COMMUNITY_BACKENDS), default="louvain",
+                    help="Backend di community detection usato per il plot")
+parser.add_argument("--compare", action="store_true",
+                    help="Confronta modularità e tempo di esecuzione di tutti i backend")
+args = parser.parse_args()
+
 G = nx.read_edgelist("./data/facebook_combined.txt", nodetype=int)
 
 # Plot dell'intero grafo
@@ -20,8 +29,12 @@ plt.title("Grafo Facebook completo")
 plt.savefig("./statistics/output/netowork.png", dpi=150)
 plt.close()
 
-# Rilevazione delle comunità (Louvain) e plot
-partition = community_louvain.best_partition(G)  # dict: nodo → id_comunità
+# Confronto dei backend di community detection (modularità e tempo)
+if args.compare:
+    compare_backends(G)
+
+# Rilevazione delle comunità e plot
+partition = load_or_compute_partition(G, method=args.method, partition_dir="./statistics/partitions")
 
 comms = list(set(partition.values()))
 mapping = {comm: idx for idx, comm in enumerate(comms)}
@@ -36,6 +49,6 @@ nx.draw_networkx_nodes(G, pos,
                        alpha=0.8)
 nx.draw_networkx_edges(G, pos, alpha=0.2)
 plt.axis('off')
-plt.title("Comunità (Louvain) nel grafo Facebook")
+plt.title(f"Comunità ({args.method}) nel grafo Facebook")
 plt.savefig("./statistics/output/communities.png", dpi=150)
 plt.close()
@@ -0,0 +1,52 @@
+from typing import Hashable, Iterable, Sequence, Tuple
+
+import numpy as np
+
+# Directory di default degli array di attivazione, accanto ai CSV in algorithms/logs
+ACTIVATION_DIR = "./logs/activation"
+
+
+class ActivationBudgets:
+    """
+        Curva budget-influenza di una sweep come un unico array di interi: per ogni nodo, l'indice del primo
+        budget (riga del CSV degli esperimenti) in cui il nodo è seed o influenzato; -1 se non lo è mai.
+
+        L'array viene costruito incrementalmente con update() durante la sweep. Per le sweep annidate
+        (seed set crescenti, come in CSG con warm start) l'insieme influenzato cresce con il budget e
+        l'istogramma cumulativo degli indici restituisce esattamente l'influenza a ogni budget; altrimenti
+        ne è un limite superiore (unione delle influenze fino a quel budget) e nested diventa False.
+    """
+
+    def __init__(self, nodes: Iterable[Hashable], budgets: Sequence[float]):
+        self.nodes = np.array(sorted(nodes))
+        self._position = {v: i for i, v in enumerate(self.nodes.tolist())}
+        self.activation = np.full(len(self.nodes), -1, dtype=np.int32)
+        self.budgets = np.asarray(budgets, dtype=np.float64)
+        self.nested = True
+        self._previous = np.zeros(len(self.nodes), dtype=bool)
+
+    def update(self, index: int, influenced: Iterable[Hashable]) -> None:
+        """Registra l'insieme influenzato (seed compresi) della riga index."""
+        current = np.zeros(len(self.nodes), dtype=bool)
+        current[[self._position[v] for v in influenced]] = True
+
+        if np.any(self._previous & ~current):
+            self.nested = False
+        self._previous = current
+
+        self.activation[current & (self.activation < 0)] = index
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, nodes=self.nodes, activation=self.activation,
+                            budgets=self.budgets, nested=self.nested)
+
+
+def load_activation(path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, bool]:
+    """(nodes, activation, budgets, nested) salvati da ActivationBudgets.save."""
+    with np.load(path) as data:
+        return data["nodes"], data["activation"], data["budgets"], bool(data["nested"])
+
+
+def influence_curve(activation: np.ndarray, num_budgets: int) -> np.ndarray:
+    """Numero di nodi attivi a ogni indice di budget: istogramma cumulativo di activation."""
+    return np.cumsum(np.bincount(activation[activation >= 0], minlength=num_budgets)[:num_budgets])
@@ -0,0 +1,80 @@
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def adaptive_sweep(evaluate: Callable[[int], Sequence[float]], num_points: int, initial_points: int = 17,
+                   tolerance: float = 0.0, saturated: Optional[Callable[[Sequence[float]], bool]] = None
+                   ) -> List[Tuple[int, Sequence[float]]]:
+    """
+        Campionamento adattivo di una griglia di budget 0..num_points-1 (indici della sweep a passo fisso).
+
+        Parte da initial_points indici equispaziati, valutati in ordine crescente; appena saturated(metriche)
+        è vero (es. influenza = |V|) gli indici successivi non vengono valutati. Poi ogni intervallo tra due
+        indici valutati consecutivi viene bisecato finché una delle metriche cambia di più di tolerance tra
+        i suoi estremi e l'intervallo contiene ancora indici non valutati.
+
+        Le variazioni interne a un intervallo con estremi uguali (curve non monotone) non vengono cercate.
+
+        Args:
+            evaluate: indice -> metriche (es. (num_seeds, final_influence_size))
+            num_points: numero di indici della griglia completa
+            initial_points: dimensione della griglia iniziale
+            tolerance: variazione massima tollerata di ogni metrica tra due indici vicini
+            saturated: predicato di saturazione sulle metriche (None = nessuna saturazione)
+
+        Returns:
+            Lista (indice, metriche) ordinata per indice
+    """
+    results: Dict[int, Sequence[float]] = {}
+    coarse = np.unique(np.linspace(0, num_points - 1, min(initial_points, num_points)).round().astype(int))
+    for i in coarse.tolist():
+        results[i] = evaluate(i)
+        if saturated is not None and saturated(results[i]):
+            break
+
+    evaluated = sorted(results)
+    stack = list(zip(evaluated[:-1], evaluated[1:]))
+    while stack:
+        lo, hi = stack.pop()
+        if hi - lo <= 1:
+            continue
+        if all(abs(a - b) <= tolerance for a, b in zip(results[lo], results[hi])):
+            continue
+        mid = (lo + hi) // 2
+        results[mid] = evaluate(mid)
+        stack.extend([(mid, hi), (lo, mid)])
+
+    return sorted(results.items())
+
+
+def gallop_search(predicate: Callable[[int], bool], num_points: int) -> Optional[int]:
+    """
+        Indice minimo i in 0..num_points-1 con predicate(i) vero, per un predicato monotono (falso e poi vero).
+
+        Ricerca galoppante: prova 0, 1, 3, 7, ... (passi raddoppiati) fino al primo indice vero, poi ricerca
+        binaria nell'ultimo intervallo; O(log i) chiamate a predicate. Restituisce None se anche l'ultimo
+        indice è falso.
+    """
+    if num_points <= 0:
+        return None
+    if predicate(0):
+        return 0
+
+    lo, jump = 0, 1
+    while True:
+        hi = min(lo + jump, num_points - 1)
+        if predicate(hi):
+            break
+        if hi == num_points - 1:
+            return None
+        lo, jump = hi, jump * 2
+
+    # predicate(lo) falso, predicate(hi) vero
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if predicate(mid):
+            hi = mid
+        else:
+            lo = mid
+    return hi
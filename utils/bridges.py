@@ -0,0 +1,163 @@
+import os
+import json
+import multiprocessing as mp
+from typing import List, Optional, Tuple
+
+import numpy as np
+import networkx as nx
+
+from utils.graph_arrays import CSRGraph
+from utils.shared_graph import SharedGraph, attach_shared_graph
+
+# Cache dei local bridge (senza span) di facebook_combined.txt, accanto agli script in algorithms/
+BRIDGE_FILE = "./facebook_local_bridges.json"
+
+# Stato per processo worker, impostato una sola volta dall'initializer del pool: grafo CSR, matrice di
+# adiacenza sparsa e buffer visited riusato dalle BFS dello span
+_worker = {}
+
+
+def _init_worker(csr: CSRGraph) -> None:
+    import scipy.sparse as sp
+    n = csr.num_nodes
+    _worker["csr"] = csr
+    _worker["A"] = sp.csr_matrix((np.ones(len(csr.indices), dtype=np.int32), csr.indices, csr.indptr), shape=(n, n))
+    _worker["visited"] = np.zeros(n, dtype=bool)
+
+
+def _attach_worker(handle) -> None:
+    csr, _ = attach_shared_graph(handle)
+    _init_worker(csr)
+
+
+def _span(csr: CSRGraph, u: int, v: int, max_span: Optional[int], visited: np.ndarray) -> Optional[float]:
+    """
+        Lunghezza del cammino minimo tra u e v senza l'arco (u, v), con BFS a frontiera interrotta dopo
+        max_span livelli: inf se v non è raggiungibile (bridge), None se non viene raggiunto entro max_span.
+        visited è un buffer di n elementi a False, riportato a False prima di uscire.
+    """
+    frontier = csr.neighbors(u)
+    frontier = frontier[frontier != v]
+    touched = [np.array([u]), frontier]
+    visited[u] = True
+    level = 1
+    span = float("inf")
+    while len(frontier):
+        if max_span is not None and level >= max_span:
+            span = None
+            break
+        visited[frontier] = True
+        frontier = np.unique(csr.gather(frontier))
+        frontier = frontier[~visited[frontier]]
+        touched.append(frontier)
+        level += 1
+        if np.any(frontier == v):
+            span = level
+            break
+    visited[np.concatenate(touched)] = False
+    return span
+
+
+def _bridges_in_rows(task: Tuple[int, int, bool, Optional[int]]) -> List[Tuple]:
+    """
+        Local bridge con estremo minore nelle righe [lo, hi): un arco (u, v) è un local bridge se N(u) ∩ N(v)
+        è vuoto, ovvero se non appartiene ad alcun triangolo. I triangoli del blocco si contano con il prodotto
+        sparso A[lo:hi] @ A ristretto agli archi del blocco; la dimensione del prodotto è limitata dal numero
+        di cammini di lunghezza 2 delle righe, usato da _row_chunks per dimensionare i blocchi.
+    """
+    lo, hi, with_span, max_span = task
+    csr, A = _worker["csr"], _worker["A"]
+
+    # block - 1[triangoli > 0] lascia 1 solo sugli archi senza vicini comuni
+    block = A[lo:hi]
+    triangles = block.multiply(block @ A).tocsr()
+    without_triangles = (block - (triangles > 0).astype(np.int32)).tocoo()
+    mask = (without_triangles.data > 0) & (without_triangles.row + lo < without_triangles.col)
+    us = (without_triangles.row[mask] + lo).tolist()
+    vs = without_triangles.col[mask].tolist()
+
+    if not with_span:
+        return list(zip(us, vs))
+    visited = _worker["visited"]
+    return [(u, v, _span(csr, u, v, max_span, visited)) for u, v in zip(us, vs)]
+
+
+def _row_chunks(csr: CSRGraph, num_chunks: int, max_wedges: int) -> List[Tuple[int, int]]:
+    """
+        Blocchi contigui di righe con circa lo stesso numero di cammini di lunghezza 2 (Σ deg(w) sui vicini w
+        di ogni riga), almeno num_chunks e ciascuno con al più max_wedges cammini, salvo righe che da sole li
+        superano.
+    """
+    n = csr.num_nodes
+    # wedges[i] = cammini di lunghezza 2 che partono dalle righe 0..i-1
+    wedges = np.concatenate([[0], np.cumsum(csr.degree[csr.indices], dtype=np.int64)])[csr.indptr]
+    num_chunks = max(num_chunks, int(np.ceil(wedges[-1] / max_wedges)))
+    bounds = np.searchsorted(wedges, np.linspace(0, wedges[-1], num_chunks + 1), side="left")
+    bounds[0], bounds[-1] = 0, n
+    bounds = np.unique(np.clip(bounds, 0, n))
+    return [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+
+def local_bridges(G: nx.Graph, with_span: bool = True, max_span: Optional[int] = None,  # noqa
+                  processes: Optional[int] = None, chunks_per_process: int = 4,
+                  max_wedges: int = 2 ** 24) -> List[Tuple]:
+    """
+        Equivalente a list(nx.local_bridges(G, with_span)) senza una ricerca di cammini minimi per arco.
+
+        Gli archi privi di triangoli vengono individuati sulla rappresentazione CSR (adiacenze ordinate) con un
+        prodotto sparso per blocchi di righe, distribuiti su un pool di processi. Lo span viene calcolato solo
+        se richiesto, con una BFS limitata ai soli local bridge.
+
+        Args:
+            G: Grafo NetworkX non orientato
+            with_span: Se True restituisce triple (u, v, span), altrimenti coppie (u, v)
+            max_span: Profondità massima della BFS per lo span (None = nessun limite); gli span maggiori
+                vengono riportati come None, mentre inf resta riservato ai bridge veri e propri
+            processes: Dimensione del pool di processi (default: numero di CPU; 1 = nessun pool)
+            chunks_per_process: Numero minimo di blocchi di righe per processo
+            max_wedges: Cammini di lunghezza 2 massimi per blocco, che limitano la memoria del prodotto sparso
+
+        Returns:
+            Local bridge nello stesso ordine e con lo stesso orientamento di G.edges()
+    """
+    if G.is_directed():
+        raise nx.NetworkXNotImplemented("local_bridges non è definito per grafi orientati")
+
+    csr = CSRGraph.from_networkx(G)
+    processes = processes or mp.cpu_count()
+    chunks = _row_chunks(csr, max(1, processes * chunks_per_process), max_wedges)
+    tasks = [(lo, hi, with_span, max_span) for lo, hi in chunks]
+
+    if processes == 1 or len(tasks) <= 1:
+        _init_worker(csr)
+        results = [_bridges_in_rows(task) for task in tasks]
+    else:
+        # I worker agganciano gli array CSR in memoria condivisa invece di riceverne una copia
+        with SharedGraph(csr) as shared, \
+                mp.Pool(processes, initializer=_attach_worker, initargs=(shared.handle,)) as pool:
+            results = pool.map(_bridges_in_rows, tasks)
+
+    # Riporto i risultati all'ordine e all'orientamento degli archi di G
+    nodes = csr.nodes.tolist()
+    found = {}
+    for chunk in results:
+        for item in chunk:
+            u, v = nodes[item[0]], nodes[item[1]]
+            found[(u, v)] = found[(v, u)] = item[2:]
+
+    return [(u, v) + found[(u, v)] for u, v in G.edges() if (u, v) in found]
+
+
+def load_local_bridges(G: nx.Graph, bridges_file: str = BRIDGE_FILE) -> List[Tuple]:  # noqa
+    """Carica i local bridge da bridges_file, oppure li calcola e li salva su disco."""
+    if os.path.exists(bridges_file):
+        print("Loading local bridges from file...")
+        with open(bridges_file, "r") as f:
+            bridges = [tuple(edge) for edge in json.load(f)]
+    else:
+        print("Computing local bridges...")
+        bridges = local_bridges(G, with_span=False)
+        with open(bridges_file, "w") as f:
+            json.dump([list(edge) for edge in bridges], f)
+        print("Local bridges saved on disk.")
+    return bridges
@@ -0,0 +1,106 @@
+import os
+import json
+import random
+from typing import Any, Dict, Iterable, Optional
+
+from utils.utils import ExperimentLogger
+
+# Directory di default dei checkpoint delle sweep, accanto a ./logs
+CHECKPOINT_DIR = "./checkpoints"
+
+
+def load_checkpoint(path: str, csv_path: str, config: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+        Stato salvato da SweepCheckpoint per riprendere una sweep interrotta, oppure None se non c'è un
+        checkpoint compatibile (file assente o config diversa).
+
+        Le righe scritte nel CSV dopo l'ultimo checkpoint vengono eliminate (il file viene troncato alla
+        dimensione salvata), così i budget rifatti non compaiono due volte. Viene ripristinato anche lo stato
+        del generatore random globale. seed_set viene restituito come set.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        state = json.load(f)
+
+    if config is not None and state.get("config") != config:
+        print(f"Checkpoint {path} ignored: saved with a different configuration {state.get('config')}")
+        return None
+
+    if os.path.exists(csv_path) and os.path.getsize(csv_path) > state["log_size"]:
+        with open(csv_path, "r+b") as f:
+            f.truncate(state["log_size"])
+
+    if state.get("random_state") is not None:
+        version, internal, gauss = state["random_state"]
+        random.setstate((version, tuple(internal), gauss))
+
+    if state.get("seed_set") is not None:
+        state["seed_set"] = set(state["seed_set"])
+    print(f"Resuming from checkpoint {path}: last completed budget {state['last_budget']}")
+    return state
+
+
+class SweepCheckpoint:
+    """
+        Checkpoint periodico di una sweep sui budget, legato al logger della sweep.
+
+        update() va chiamato dopo aver loggato un budget; ogni every budget (--resume_every nei main) e
+        all'uscita dal context manager, anche per eccezione o Ctrl-C, il logger viene svuotato e lo stato
+        salvato in modo atomico: ultimo budget completato, seed set e costo del warm start, stato del
+        generatore random, dimensione del CSV e gli eventuali campi extra dell'algoritmo. load_checkpoint
+        lo rilegge con --resume.
+
+        Uso:
+            state = load_checkpoint(path, csv_path, config) if args.resume else None
+            with ExperimentLogger(csv_path) as logger, SweepCheckpoint(path, logger, config) as checkpoint:
+                for budget_k in budgets:
+                    if state and budget_k <= state["last_budget"]:
+                        continue
+                    ...
+                    checkpoint.update(budget_k, S, total_cost)
+    """
+
+    def __init__(self, path: str, logger: ExperimentLogger, config: Optional[Dict[str, Any]] = None,
+                 every: int = 10):
+        self.path = path
+        self.logger = logger
+        self.config = config
+        self.every = every
+        self._state: Optional[Dict[str, Any]] = None
+        self._pending = 0
+
+    def __enter__(self) -> "SweepCheckpoint":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.save()
+
+    def update(self, budget: float, seed_set: Optional[Iterable[int]] = None, current_cost: float = 0,
+               **extra: Any) -> None:
+        self._state = {
+            "last_budget": budget,
+            "seed_set": sorted(seed_set) if seed_set is not None else None,
+            "current_cost": current_cost,
+            **extra
+        }
+        self._pending += 1
+        if self._pending >= self.every:
+            self.save()
+
+    def save(self) -> None:
+        if self._state is None or self._pending == 0:
+            return
+        # Prima le righe su disco, poi il checkpoint che le dichiara completate
+        self.logger.flush()
+        state = dict(self._state, config=self.config, random_state=random.getstate(),
+                     log_size=os.path.getsize(self.logger.csv_path))
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+        self._pending = 0
@@ -0,0 +1,252 @@
+import os
+import json
+import time
+import hashlib
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+import numpy as np
+import networkx as nx
+
+from utils.graph_arrays import CSRGraph
+
+# Directory in cui vengono salvate le partizioni calcolate
+PARTITION_DIR = "./partitions"
+
+# Cache in memoria: (metodo, fingerprint, resolution, random_state) -> partizione
+_partition_cache: Dict[Tuple[str, str, float, Optional[int]], Dict[int, int]] = {}
+
+
+def graph_fingerprint(G: nx.Graph) -> str:  # noqa
+    """Impronta del grafo (hash degli archi ordinati), usata come chiave della cache delle partizioni."""
+    h = hashlib.sha1()
+    h.update(f"{G.number_of_nodes()}:{G.number_of_edges()}".encode())
+    for u, v in sorted(tuple(sorted(e)) for e in G.edges()):
+        h.update(f"{u},{v};".encode())
+    return h.hexdigest()[:16]
+
+
+# ============= Backend di community detection =============
+
+def _louvain_python(G: nx.Graph, resolution: float, random_state: Optional[int]) -> Dict[int, int]:  # noqa
+    """Implementazione di riferimento: python-louvain (pure Python)."""
+    import community as community_louvain  # noqa
+    return community_louvain.best_partition(G, resolution=resolution, random_state=random_state)
+
+
+def _adjacency(csr: CSRGraph):
+    """Matrice di adiacenza sparsa (scipy) con pesi unitari."""
+    import scipy.sparse as sp
+    n = csr.num_nodes
+    return sp.csr_matrix((np.ones(len(csr.indices)), csr.indices, csr.indptr), shape=(n, n))
+
+
+def _compact(labels: np.ndarray) -> np.ndarray:
+    """Rinumera le etichette in 0..k-1 nell'ordine di prima apparizione."""
+    _, first, inverse = np.unique(labels, return_index=True, return_inverse=True)
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[np.argsort(first)] = np.arange(len(first))
+    return rank[inverse]
+
+
+def _row_argmax(indptr: np.ndarray, cols: np.ndarray, scores: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per ogni riga di una matrice CSR: colonna con score massimo (a parità, la più piccola) e relativo score."""
+    rows = np.repeat(np.arange(n), np.diff(indptr))
+    best_col = np.full(n, -1, dtype=np.int64)
+    best_score = np.full(n, -np.inf)
+    if len(rows) == 0:
+        return best_col, best_score
+    order = np.lexsort((cols, -scores, rows))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = rows[order][1:] != rows[order][:-1]
+    chosen = order[first]
+    best_col[rows[chosen]] = cols[chosen]
+    best_score[rows[chosen]] = scores[chosen]
+    return best_col, best_score
+
+
+def _label_propagation_csr(G: nx.Graph, resolution: float, random_state: Optional[int],  # noqa
+                           max_iter: int = 100) -> Dict[int, int]:
+    """
+        Label propagation vettorizzata (NumPy/SciPy). Ad ogni iterazione i conteggi nodo x etichetta dei
+        vicini si ottengono con un prodotto sparso; una metà casuale dei nodi adotta l'etichetta più frequente
+        (se è strettamente più frequente di quella corrente), il che evita le oscillazioni dell'update
+        sincrono. I pareggi vengono risolti a caso. resolution non è usata.
+    """
+    import scipy.sparse as sp
+    csr = CSRGraph.from_networkx(G)
+    n = csr.num_nodes
+    A = _adjacency(csr)
+    rng = np.random.default_rng(random_state)
+    labels = np.arange(n)
+
+    for _ in range(max_iter):
+        membership = sp.csr_matrix((np.ones(n), (np.arange(n), labels)), shape=(n, n))
+        counts = (A @ membership).tocsr()
+        counts.sort_indices()
+        # Rumore in [0, 0.5) per rompere a caso i pareggi senza alterare l'ordine dei conteggi interi
+        noisy = counts.data + 0.5 * rng.random(len(counts.data))
+        best, best_score = _row_argmax(counts.indptr, counts.indices, noisy, n)
+        best_count = np.floor(best_score)
+        current = np.asarray(counts[np.arange(n), labels]).ravel()
+
+        change = (best >= 0) & (best_count > current) & (rng.random(n) < 0.5)
+        if not change.any():
+            # Nessun nodo campionato cambia: controllo se la partizione è stabile per tutti i nodi
+            if not ((best >= 0) & (best_count > current)).any():
+                break
+            continue
+        labels = np.where(change, best, labels)
+
+    return dict(zip(csr.nodes.tolist(), _compact(labels).tolist()))
+
+
+def _local_move_level(A, resolution: float, rng: np.random.Generator, max_iter: int) -> np.ndarray:
+    """Fase di local move di Louvain, vettorizzata: restituisce l'assegnazione nodo -> comunità."""
+    import scipy.sparse as sp
+    n = A.shape[0]
+    strength = np.asarray(A.sum(axis=1)).ravel()
+    two_m = strength.sum()
+    self_loops = A.diagonal()
+    off_diag = (A - sp.diags(self_loops)).tocsr()
+    off_diag.eliminate_zeros()
+    labels = np.arange(n)
+
+    for _ in range(max_iter):
+        membership = sp.csr_matrix((np.ones(n), (np.arange(n), labels)), shape=(n, n))
+        k_in = (off_diag @ membership).tocsr()
+        k_in.sort_indices()
+        sigma = np.bincount(labels, weights=strength, minlength=n)
+
+        rows = np.repeat(np.arange(n), np.diff(k_in.indptr))
+        cols = k_in.indices
+        # Σ della comunità di destinazione, escludendo il nodo stesso se è la sua comunità attuale
+        sigma_target = sigma[cols] - np.where(cols == labels[rows], strength[rows], 0)
+        scores = k_in.data - resolution * strength[rows] * sigma_target / two_m
+        best, best_score = _row_argmax(k_in.indptr, cols, scores, n)
+
+        # Guadagno di restare nella comunità attuale (0 se il nodo vi è da solo)
+        current_k = np.asarray(k_in[np.arange(n), labels]).ravel()
+        stay = current_k - resolution * strength * (sigma[labels] - strength) / two_m
+
+        improve = (best >= 0) & (best_score > stay + 1e-12)
+        move = improve & (rng.random(n) < 0.5)
+        if not improve.any():
+            break
+        labels = np.where(move, best, labels)
+
+    return _compact(labels)
+
+
+def _local_move_csr(G: nx.Graph, resolution: float, random_state: Optional[int],  # noqa
+                    max_levels: int = 10, max_iter: int = 50) -> Dict[int, int]:
+    """
+        Louvain multilivello sul backend ad array: local move vettorizzato (mosse simultanee su una metà
+        casuale dei nodi che migliorano la modularità) seguito dall'aggregazione delle comunità
+        (A' = Pᵀ A P), finché un livello non produce più accorpamenti.
+    """
+    import scipy.sparse as sp
+    csr = CSRGraph.from_networkx(G)
+    A = _adjacency(csr)
+    rng = np.random.default_rng(random_state)
+    assignment = np.arange(csr.num_nodes)
+
+    for _ in range(max_levels):
+        labels = _local_move_level(A, resolution, rng, max_iter)
+        k = labels.max() + 1 if len(labels) else 0
+        if k == A.shape[0]:
+            break
+        assignment = labels[assignment]
+        P = sp.csr_matrix((np.ones(len(labels)), (np.arange(len(labels)), labels)), shape=(len(labels), k))
+        A = (P.T @ A @ P).tocsr()
+
+    return dict(zip(csr.nodes.tolist(), _compact(assignment).tolist()))
+
+
+# Backend disponibili: nome -> funzione (G, resolution, random_state) -> partizione
+COMMUNITY_BACKENDS: Dict[str, Callable[[nx.Graph, float, Optional[int]], Dict[int, int]]] = {
+    "louvain": _louvain_python,
+    "label_propagation": _label_propagation_csr,
+    "local_move": _local_move_csr,
+}
+
+
+def detect_communities(G: nx.Graph, method: str = "louvain", resolution: float = 1.0,  # noqa
+                       random_state: Optional[int] = 42) -> Dict[int, int]:
+    """Calcola la partizione nodo -> comunità con il backend indicato (vedi COMMUNITY_BACKENDS)."""
+    if method not in COMMUNITY_BACKENDS:
+        raise ValueError(f"Metodo di community detection non supportato: {method}")
+    return COMMUNITY_BACKENDS[method](G, resolution, random_state)
+
+
+def partition_modularity(G: nx.Graph, partition: Dict[int, int], resolution: float = 1.0) -> float:  # noqa
+    """Modularità della partizione, calcolata sugli array CSR."""
+    csr = CSRGraph.from_networkx(G)
+    labels = _compact(np.array([partition[v] for v in csr.nodes.tolist()]))
+    two_m = len(csr.indices)
+    if two_m == 0:
+        return 0.0
+    rows = np.repeat(np.arange(csr.num_nodes), np.diff(csr.indptr))
+    internal = np.bincount(labels[rows], weights=labels[rows] == labels[csr.indices], minlength=labels.max() + 1)
+    sigma = np.bincount(labels, weights=csr.degree, minlength=labels.max() + 1)
+    return float(np.sum(internal / two_m - resolution * (sigma / two_m) ** 2))
+
+
+def compare_backends(G: nx.Graph, methods: Optional[List[str]] = None, resolution: float = 1.0,  # noqa
+                     random_state: Optional[int] = 42) -> List[Dict[str, Any]]:
+    """Esegue ogni backend su G e ne riporta modularità, numero di comunità e tempo di esecuzione."""
+    report = []
+    for method in methods or list(COMMUNITY_BACKENDS):
+        start_time = time.time()
+        partition = detect_communities(G, method, resolution, random_state)
+        runtime = time.time() - start_time
+        report.append({
+            "method": method,
+            "modularity": partition_modularity(G, partition, resolution),
+            "num_communities": len(set(partition.values())),
+            "runtime": runtime
+        })
+        print(f"{method}: modularity {report[-1]['modularity']:.4f}, "
+              f"{report[-1]['num_communities']} communities, {runtime:.2f}s")
+    return report
+
+
+def load_or_compute_partition(G: nx.Graph, resolution: float = 1.0, random_state: Optional[int] = 42,  # noqa
+                              partition_dir: Optional[str] = PARTITION_DIR, method: str = "louvain") -> Dict[int, int]:
+    """
+        Restituisce la partizione di G, calcolandola una sola volta per
+        (metodo, grafo, resolution, random_state): viene cercata prima nella cache in memoria,
+        poi su disco in partition_dir, e solo altrimenti calcolata e salvata.
+
+        Args:
+            G: Grafo NetworkX
+            resolution: Parametro di risoluzione
+            random_state: Seed del backend (None = non deterministico, la partizione non viene salvata su disco)
+            partition_dir: Directory di salvataggio (None = solo cache in memoria)
+            method: Backend di community detection (default: python-louvain)
+
+        Returns:
+            Dizionario nodo -> id della comunità
+    """
+    key = (method, graph_fingerprint(G), resolution, random_state)
+    if key in _partition_cache:
+        return _partition_cache[key]
+
+    path = None
+    if partition_dir and random_state is not None:
+        path = os.path.join(partition_dir, f"{method}_{key[1]}_r{resolution}_s{random_state}.json")
+
+    if path and os.path.exists(path):
+        print(f"Loading {method} partition from file...")
+        with open(path, "r") as f:
+            partition = {int(k): int(v) for k, v in json.load(f).items()}
+    else:
+        print(f"Computing {method} partition...")
+        partition = detect_communities(G, method, resolution, random_state)
+        if path:
+            os.makedirs(partition_dir, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(partition, f)
+            print(f"{method} partition saved on disk.")
+
+    _partition_cache[key] = partition
+    return partition
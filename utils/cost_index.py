@@ -0,0 +1,77 @@
+import bisect
+from typing import Dict, Optional, Tuple, Union
+
+_EMPTY = (-float("inf"), float("inf"))
+
+
+class AffordableIndex:
+    """
+        Segment tree sui candidati ordinati per costo crescente. Ogni foglia contiene il valore
+        (rapporto guadagno/costo) del nodo; i nodi interni il massimo dei figli.
+        Permette di trovare in O(log n) il nodo con valore massimo tra quelli con costo <= un limite,
+        e di aggiornare/rimuovere un candidato in O(log n).
+
+        A parità di valore viene preferito l'id più piccolo, come nell'heap di CSG_new.
+    """
+
+    def __init__(self, costs: Dict[int, Union[int, float]], values: Optional[Dict[int, float]] = None):
+        self._order = sorted(costs, key=lambda v: (costs[v], v))
+        self._sorted_costs = [costs[v] for v in self._order]
+        self._pos = {v: i for i, v in enumerate(self._order)}
+
+        size = 1
+        while size < max(1, len(self._order)):
+            size *= 2
+        self._size = size
+        self._tree = [_EMPTY] * (2 * size)
+        self._count = 0
+
+        if values:
+            for v, val in values.items():
+                if v in self._pos:
+                    self._tree[size + self._pos[v]] = (val, -v)
+                    self._count += 1
+            for i in range(size - 1, 0, -1):
+                self._tree[i] = max(self._tree[2 * i], self._tree[2 * i + 1])
+
+    def __len__(self) -> int:
+        """Numero di candidati con un valore (non rimossi)."""
+        return self._count
+
+    def __contains__(self, v) -> bool:
+        return v in self._pos and self._tree[self._size + self._pos[v]] != _EMPTY
+
+    def update(self, v: int, value: float) -> None:
+        """Imposta il valore del candidato v."""
+        self._set(self._pos[v], (value, -v))
+
+    def remove(self, v: int) -> None:
+        """Rimuove v dai candidati (ad es. perché selezionato)."""
+        self._set(self._pos[v], _EMPTY)
+
+    def best_affordable(self, max_cost: Union[int, float]) -> Optional[Tuple[int, float]]:
+        """Restituisce (nodo, valore) del miglior candidato con costo <= max_cost, oppure None."""
+        right = bisect.bisect_right(self._sorted_costs, max_cost)
+        best = _EMPTY
+        lo, hi = self._size, self._size + right
+        while lo < hi:
+            if lo & 1:
+                best = max(best, self._tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                best = max(best, self._tree[hi])
+            lo //= 2
+            hi //= 2
+        if best == _EMPTY:
+            return None
+        return -best[1], best[0]
+
+    def _set(self, i: int, item: Tuple[float, float]) -> None:
+        i += self._size
+        self._count += (item != _EMPTY) - (self._tree[i] != _EMPTY)
+        self._tree[i] = item
+        i //= 2
+        while i:
+            self._tree[i] = max(self._tree[2 * i], self._tree[2 * i + 1])
+            i //= 2
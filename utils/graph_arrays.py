@@ -0,0 +1,99 @@
+from typing import Dict, Hashable, Optional, Union
+
+import numpy as np
+import networkx as nx
+
+
+class CSRGraph:
+    """
+        Rappresentazione compatta (CSR) di un grafo non orientato.
+
+        I nodi vengono ordinati per id e rinumerati in 0..n-1: i vicini del nodo in posizione i sono
+        indices[indptr[i]:indptr[i + 1]] (ordinati). nodes[i] restituisce l'id originale.
+        Ogni arco compare in entrambe le direzioni, quindi len(indices) = 2m.
+    """
+
+    def __init__(self, nodes: np.ndarray, indptr: np.ndarray, indices: np.ndarray,
+                 degree: Optional[np.ndarray] = None):
+        self.nodes = nodes
+        self.indptr = indptr
+        self.indices = indices
+        self.degree = degree if degree is not None else np.diff(indptr).astype(np.int32)
+        self._position: Optional[Dict[Hashable, int]] = None
+
+    @classmethod
+    def from_networkx(cls, G: nx.Graph) -> "CSRGraph":  # noqa
+        nodes = np.array(sorted(G.nodes()))
+        position = {v: i for i, v in enumerate(nodes.tolist())}
+        src, dst = [], []
+        for u, v in G.edges():
+            if u == v:
+                continue
+            src.append(position[u])
+            dst.append(position[v])
+        return cls._from_edge_arrays(nodes, np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64))
+
+    @classmethod
+    def from_edgelist(cls, path: str, return_order: bool = False):
+        """
+            Legge direttamente un file edgelist di interi (come facebook_combined.txt) senza passare da networkx.
+            Con return_order restituisce anche le posizioni dei nodi nell'ordine di prima comparsa nel file,
+            cioè l'ordine di G.nodes() del grafo letto con nx.read_edgelist.
+        """
+        edges = np.loadtxt(path, dtype=np.int64, ndmin=2)
+        nodes, first, inverse = np.unique(edges[:, :2], return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1, 2)
+        mask = inverse[:, 0] != inverse[:, 1]
+        csr = cls._from_edge_arrays(nodes, inverse[mask, 0], inverse[mask, 1])
+        if return_order:
+            return csr, np.argsort(first, kind="stable")
+        return csr
+
+    @classmethod
+    def _from_edge_arrays(cls, nodes: np.ndarray, src: np.ndarray, dst: np.ndarray) -> "CSRGraph":
+        n = len(nodes)
+        # Arco in entrambe le direzioni, duplicati rimossi (grafo semplice)
+        both = np.unique(np.concatenate([src * n + dst, dst * n + src]))
+        rows = (both // n).astype(np.int32)
+        cols = (both % n).astype(np.int32)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return cls(nodes, indptr, cols)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices) // 2
+
+    # Stessi nomi di nx.Graph, così un CSRGraph può essere passato come G ai logger
+    def number_of_nodes(self) -> int:
+        return self.num_nodes
+
+    def number_of_edges(self) -> int:
+        return self.num_edges
+
+    def neighbors(self, i: int) -> np.ndarray:
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def gather(self, rows: np.ndarray) -> np.ndarray:
+        """Concatenazione dei vicini di tutti i nodi in rows (posizioni), senza loop Python."""
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=self.indices.dtype)
+        offsets = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+        return self.indices[offsets + np.arange(total)]
+
+    def position(self, v: Hashable) -> int:
+        """Posizione (0..n-1) del nodo con id v."""
+        if self._position is None:
+            self._position = {node: i for i, node in enumerate(self.nodes.tolist())}
+        return self._position[v]
+
+    def node_array(self, values: Dict[Hashable, Union[int, float]], dtype=np.float64) -> np.ndarray:
+        """Converte un dizionario nodo -> valore (costi, threshold) in un array allineato a nodes."""
+        return np.array([values[v] for v in self.nodes.tolist()], dtype=dtype)
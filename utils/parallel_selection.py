@@ -0,0 +1,107 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from utils.smile_code import SelectionContext
+
+# Array condivisi, agganciati una sola volta per processo worker dall'initializer del pool
+_worker_arrays = {}
+_worker_shms = []
+
+
+def _attach(names: dict, shapes: dict) -> None:
+    for key, (name, dtype) in names.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _worker_shms.append(shm)
+        _worker_arrays[key] = np.ndarray(shapes[key], dtype=dtype, buffer=shm.buf)
+
+
+def _local_scan(tasks: List[Tuple[int, float]]) -> List[Tuple[int, List[int], float]]:
+    """Selezione locale (ordine per betweenness, salta ciò che non entra) per un blocco di comunità."""
+    offsets = _worker_arrays["offsets"]
+    results = []
+    for comm_index, local_budget in tasks:
+        start, end = offsets[comm_index], offsets[comm_index + 1]
+        ordered = _worker_arrays["nodes"][start:end].tolist()
+        costs = _worker_arrays["costs"][start:end].tolist()
+        suffix_min = _worker_arrays["suffix_min"][start:end].tolist() + [float("inf")]
+        selected: List[int] = []
+        spent = SelectionContext._scan(ordered, costs, suffix_min, local_budget, selected, check_sum=True)  # noqa
+        results.append((comm_index, selected, spent))
+    return results
+
+
+class ParallelLocalSelector:
+    """
+        Esegue la fase locale di SMiLe-CoDe in parallelo su un pool di processi.
+
+        Gli array ordinati delle comunità (nodi, costi, minimi dei suffissi) del SelectionContext vengono
+        copiati una sola volta in memoria condivisa; i worker li agganciano per nome senza copie né pickling.
+        I risultati vengono uniti nell'ordine delle comunità, quindi i seed sono identici a context.query,
+        e il budget non speso passa alla fase globale.
+
+        Uso:
+            with ParallelLocalSelector(context, processes=8) as selector:
+                S = selector.query(budget)
+    """
+
+    def __init__(self, context: SelectionContext, processes: Optional[int] = None, chunks_per_process: int = 4):
+        self.context = context
+        self.processes = processes or mp.cpu_count()
+        self.chunks_per_process = chunks_per_process
+        self._shms = []
+        self._pool = None
+
+    def __enter__(self) -> "ParallelLocalSelector":
+        sizes = [size for _, size, _, _, _ in self.context.communities]
+        arrays = {
+            "offsets": np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64),
+            "nodes": np.array([v for _, _, ordered, _, _ in self.context.communities for v in ordered],
+                              dtype=np.int64),
+            "costs": np.array([c for _, _, _, costs, _ in self.context.communities for c in costs],
+                              dtype=np.float64),
+            "suffix_min": np.array([m for _, _, _, _, suffix in self.context.communities for m in suffix[:-1]],
+                                   dtype=np.float64),
+        }
+        names, shapes = {}, {}
+        for key, array in arrays.items():
+            shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+            self._shms.append(shm)
+            names[key] = (shm.name, array.dtype)
+            shapes[key] = array.shape
+
+        self._pool = mp.Pool(self.processes, initializer=_attach, initargs=(names, shapes))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        for shm in self._shms:
+            shm.close()
+            shm.unlink()
+        self._shms = []
+
+    def query(self, total_budget: float) -> List[int]:
+        """Come SelectionContext.query, con la fase locale distribuita sui worker."""
+        if self._pool is None:
+            raise RuntimeError("ParallelLocalSelector va usato come context manager")
+
+        tasks = [(i, local_budget) for i, local_budget in enumerate(self.context.local_budgets(total_budget))
+                 if local_budget > 0]
+        num_chunks = max(1, min(len(tasks), self.processes * self.chunks_per_process))
+        chunks = [tasks[i::num_chunks] for i in range(num_chunks)]
+
+        results = sorted(r for chunk in self._pool.map(_local_scan, chunks) for r in chunk)
+
+        seeds: List[int] = []
+        remaining_budget = total_budget
+        for _, selected, spent in results:
+            seeds.extend(selected)
+            remaining_budget -= spent
+
+        return self.context.global_phase(seeds, remaining_budget)
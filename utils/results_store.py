@@ -0,0 +1,314 @@
+import os
+import re
+import csv
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.utils import CASCADE_HEADERS, EXPERIMENT_HEADERS
+from utils.seed_sets import decode_seed_sets
+
+# Database di default, accanto ai CSV in algorithms/logs
+RESULTS_DB = "./logs/results.db"
+
+# budget, total_cost ed execution_time non hanno affinità di tipo: interi e float vengono conservati così
+# come sono nei CSV, e l'esportazione li riscrive identici. algorithm è la chiave dell'algoritmo ricavata dal
+# nome del file (vedi algorithm_key_of), algorithm_name il valore scritto nel CSV.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    source_row INTEGER NOT NULL,
+    algorithm TEXT NOT NULL,
+    timestamp TEXT,
+    algorithm_name TEXT NOT NULL,
+    cost_name TEXT NOT NULL,
+    cost_function TEXT,
+    use_threshold INTEGER,
+    budget,
+    num_nodes INTEGER,
+    num_edges INTEGER,
+    num_seeds INTEGER,
+    total_cost,
+    execution_time,
+    additional_info TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_runs_source ON runs (source, source_row);
+
+CREATE TABLE IF NOT EXISTS seed_sets (
+    run_id INTEGER PRIMARY KEY REFERENCES runs (id) ON DELETE CASCADE,
+    seed_set TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS cascades (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    source TEXT NOT NULL,
+    timestamp TEXT,
+    algorithm_name TEXT,
+    seed_size INTEGER,
+    final_influence TEXT,
+    final_influence_size INTEGER,
+    num_nodes INTEGER,
+    num_edges INTEGER,
+    execution_time,
+    round INTEGER,
+    additional_info TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_cascades_run ON cascades (run_id);
+"""
+
+# Indice delle query per (algoritmo, costo, intervallo di budget); creato dopo l'eventuale migrazione
+_KEY_INDEX = "CREATE INDEX IF NOT EXISTS idx_runs_algorithm ON runs (algorithm, cost_name, budget)"
+
+_RUN_COLUMNS = ["timestamp", "algorithm_name", "cost_function", "use_threshold", "budget", "num_nodes",
+                "num_edges", "num_seeds", "total_cost", "execution_time", "additional_info"]
+_CASCADE_COLUMNS = ["timestamp", "algorithm_name", "seed_size", "final_influence", "final_influence_size",
+                    "num_nodes", "num_edges", "execution_time", "round", "additional_info"]
+_TEXT_COLUMNS = {"timestamp", "algorithm_name", "cost_function", "final_influence"}
+
+
+def cost_name_of(cost_function: str) -> str:
+    """'cost2: random int in ...' -> 'cost2' (le descrizioni dei main iniziano tutte con il nome del costo)."""
+    return cost_function.split(":", 1)[0].strip()
+
+
+def algorithm_key_of(source: str) -> Optional[str]:
+    """
+        Chiave dell'algoritmo dal nome del CSV cost{N}_{algo}[_suffisso].csv: tutto ciò che segue cost{N}_
+        (es. 'SMiLe-CoDe', 'WTSS_pipeline', 'CSG_sub_function2'). Così varianti e modalità diverse dello stesso
+        algoritmo restano distinte anche se scrivono lo stesso algorithm_name. None se il nome non segue lo schema.
+    """
+    match = re.match(r"^cost\d+_(.+)\.csv$", os.path.basename(source))
+    return match.group(1) if match else None
+
+
+def _number(value: Any) -> Any:
+    """Converte i campi numerici letti da CSV (stringhe) lasciando intatti i vuoti."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            try:
+                return float(value)
+            except ValueError:
+                return value
+    return value
+
+
+def _flag(value: Any) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        return int(value == "True")
+    return int(bool(value))
+
+
+class ResultsStore:
+    """
+        Archivio SQLite dei risultati: esecuzioni (runs), seed set e cascate.
+
+        Le righe hanno lo stesso schema dei CSV prodotti da ExperimentLogger; ogni run ricorda il file CSV
+        (source) e la riga (source_row) da cui proviene, così i CSV possono essere reimportati e riesportati
+        senza duplicati. Gli algoritmi sono identificati dalla chiave ricavata dal nome del file
+        (algorithm_key_of); le query per (algoritmo, costo, intervallo di budget) usano l'indice
+        idx_runs_algorithm.
+
+        Uso:
+            with ResultsStore("./logs/results.db") as store:
+                store.import_logs("./logs")
+                runs = store.query_runs("CSG", "cost2", min_budget=1000, max_budget=5000)
+    """
+
+    def __init__(self, db_path: str = RESULTS_DB):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(_SCHEMA)
+        self._migrate()
+        self.conn.execute(_KEY_INDEX)
+
+    def _migrate(self) -> None:
+        """Database creati prima della colonna algorithm: la colonna viene aggiunta e ricavata da source."""
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(runs)")}
+        if "algorithm" in columns:
+            return
+        with self.conn:
+            self.conn.execute("ALTER TABLE runs ADD COLUMN algorithm TEXT")
+            self.conn.execute("DROP INDEX IF EXISTS idx_runs_key")
+            for (source,) in self.conn.execute("SELECT DISTINCT source FROM runs").fetchall():
+                self.conn.execute("UPDATE runs SET algorithm = COALESCE(?, algorithm_name) WHERE source = ?",
+                                  (algorithm_key_of(source), source))
+
+    def __enter__(self) -> "ResultsStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    # ============= Scrittura =============
+
+    def insert_runs(self, rows: Iterable[Dict[str, Any]], source: str, first_row: int = 0,
+                    algorithm: Optional[str] = None) -> List[int]:
+        """
+            Inserisce in un'unica transazione le righe di esperimento provenienti da source, numerate da
+            first_row; restituisce gli id dei run nello stesso ordine. I run di source da first_row in poi
+            già presenti vengono eliminati prima (con i relativi seed set e cascate), quindi reimportare un CSV
+            più corto non lascia run orfani. algorithm è la chiave dell'algoritmo (default: ricavata dal nome
+            di source, altrimenti algorithm_name della riga).
+        """
+        algorithm = algorithm or algorithm_key_of(source)
+        run_ids = []
+        with self.conn:
+            self.conn.execute("DELETE FROM runs WHERE source = ? AND source_row >= ?", (source, first_row))
+            for i, row in enumerate(rows, start=first_row):
+                values = [row.get(c) if c in _TEXT_COLUMNS else _flag(row.get(c)) if c == "use_threshold"
+                          else _number(row.get(c)) for c in _RUN_COLUMNS[:-1]]
+                values.append(row.get("additional_info") or None)
+                cursor = self.conn.execute(
+                    f"INSERT INTO runs (source, source_row, algorithm, cost_name, {', '.join(_RUN_COLUMNS)}) "
+                    f"VALUES (?, ?, ?, ?, {', '.join('?' * len(_RUN_COLUMNS))})",
+                    [source, i, algorithm or row.get("algorithm_name"),
+                     cost_name_of(row.get("cost_function") or "")] + values
+                )
+                run_ids.append(cursor.lastrowid)
+                self.conn.execute("INSERT INTO seed_sets (run_id, seed_set) VALUES (?, ?)",
+                                  (cursor.lastrowid, row["seed_set"]))
+        return run_ids
+
+    def insert_cascades(self, rows: Iterable[Dict[str, Any]], run_ids: List[int], source: str) -> int:
+        """
+            Inserisce in un'unica transazione le righe di cascata di source. experiment_result_row (1-based,
+            come scritto da cascade.py) indica il run corrispondente in run_ids. Le cascate già importate da
+            source vengono sostituite.
+        """
+        count = 0
+        with self.conn:
+            self.conn.execute("DELETE FROM cascades WHERE source = ?", (source,))
+            for row in rows:
+                run_id = run_ids[int(row["experiment_result_row"]) - 1]
+                values = [row.get(c) if c in _TEXT_COLUMNS else _number(row.get(c)) for c in _CASCADE_COLUMNS[:-1]]
+                values.append(row.get("additional_info") or None)
+                self.conn.execute(
+                    f"INSERT INTO cascades (run_id, source, {', '.join(_CASCADE_COLUMNS)}) "
+                    f"VALUES (?, ?, {', '.join('?' * len(_CASCADE_COLUMNS))})",
+                    [run_id, source] + values
+                )
+                count += 1
+        return count
+
+    def import_experiment_csv(self, csv_path: str) -> List[int]:
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        # I seed set codificati come delta vengono salvati per intero
+        for row, seed_set in zip(rows, decode_seed_sets([row["seed_set"] for row in rows])):
+            row["seed_set"] = json.dumps(sorted(seed_set))
+        return self.insert_runs(rows, source=os.path.basename(csv_path))
+
+    def import_cascade_csv(self, csv_path: str, run_ids: List[int]) -> int:
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        return self.insert_cascades(rows, run_ids, source=os.path.basename(csv_path))
+
+    def import_logs(self, logs_dir: str = "./logs") -> Dict[str, int]:
+        """
+            Importa tutti i CSV cost{N}_{algo}.csv di logs_dir e le relative cascate
+            cascade_results/cost{N}_{algo}_results.csv; restituisce il numero di righe per file.
+        """
+        imported = {}
+        for name in sorted(os.listdir(logs_dir)):
+            if not (name.startswith("cost") and name.endswith(".csv")):
+                continue
+            run_ids = self.import_experiment_csv(os.path.join(logs_dir, name))
+            imported[name] = len(run_ids)
+
+            cascade_path = os.path.join(logs_dir, "cascade_results", name[:-len(".csv")] + "_results.csv")
+            if os.path.exists(cascade_path):
+                imported[os.path.basename(cascade_path)] = self.import_cascade_csv(cascade_path, run_ids)
+        return imported
+
+    # ============= Lettura =============
+
+    @staticmethod
+    def _range_filter(algorithm: str, cost_name: str, min_budget: Optional[float],
+                      max_budget: Optional[float]):
+        clauses = ["r.algorithm = ?", "r.cost_name = ?"]
+        params: List[Any] = [algorithm, cost_name]
+        if min_budget is not None:
+            clauses.append("r.budget >= ?")
+            params.append(min_budget)
+        if max_budget is not None:
+            clauses.append("r.budget <= ?")
+            params.append(max_budget)
+        return " AND ".join(clauses), params
+
+    def query_runs(self, algorithm: str, cost_name: str, min_budget: Optional[float] = None,
+                   max_budget: Optional[float] = None, with_seed_sets: bool = False) -> List[Dict[str, Any]]:
+        """Run di (algoritmo, costo) con budget in [min_budget, max_budget], ordinati per budget."""
+        where, params = self._range_filter(algorithm, cost_name, min_budget, max_budget)
+        seed_column = ", s.seed_set" if with_seed_sets else ""
+        seed_join = " JOIN seed_sets s ON s.run_id = r.id" if with_seed_sets else ""
+        rows = self.conn.execute(
+            f"SELECT r.*{seed_column} FROM runs r{seed_join} WHERE {where} ORDER BY r.budget, r.id", params
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def query_cascades(self, algorithm: str, cost_name: str, min_budget: Optional[float] = None,
+                       max_budget: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Cascate dei run di (algoritmo, costo) con budget nell'intervallo, insieme a budget e num_seeds."""
+        where, params = self._range_filter(algorithm, cost_name, min_budget, max_budget)
+        rows = self.conn.execute(
+            "SELECT c.*, r.budget, r.num_seeds, r.cost_function, r.cost_name, r.algorithm "
+            f"FROM runs r JOIN cascades c ON c.run_id = r.id WHERE {where} ORDER BY r.budget, c.id", params
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    # ============= Esportazione nel formato CSV attuale =============
+
+    def export_experiment_csv(self, csv_path: str, algorithm: str, cost_name: str) -> int:
+        """Scrive i run di (algoritmo, costo) nel formato di log_experiment, nell'ordine di importazione."""
+        rows = self.conn.execute(
+            "SELECT r.*, s.seed_set FROM runs r JOIN seed_sets s ON s.run_id = r.id "
+            "WHERE r.algorithm = ? AND r.cost_name = ? ORDER BY r.id", (algorithm, cost_name)
+        ).fetchall()
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=EXPERIMENT_HEADERS)
+            writer.writeheader()
+            for row in rows:
+                out = {h: row[h] for h in EXPERIMENT_HEADERS if h != "use_threshold"}
+                out["use_threshold"] = bool(row["use_threshold"]) if row["use_threshold"] is not None else ""
+                out["additional_info"] = row["additional_info"] or ""
+                writer.writerow({k: "" if v is None else v for k, v in out.items()})
+        return len(rows)
+
+    def export_cascade_csv(self, csv_path: str, algorithm: str, cost_name: str) -> int:
+        """
+            Scrive le cascate di (algoritmo, costo) nel formato di log_cascade; experiment_result_row fa
+            riferimento alla riga (1-based) del CSV prodotto da export_experiment_csv.
+        """
+        run_rows = {run_id: i + 1 for i, (run_id,) in enumerate(self.conn.execute(
+            "SELECT id FROM runs WHERE algorithm = ? AND cost_name = ? ORDER BY id", (algorithm, cost_name)
+        ))}
+        rows = self.conn.execute(
+            "SELECT c.*, s.seed_set FROM runs r JOIN cascades c ON c.run_id = r.id "
+            "JOIN seed_sets s ON s.run_id = r.id "
+            "WHERE r.algorithm = ? AND r.cost_name = ? ORDER BY c.id", (algorithm, cost_name)
+        ).fetchall()
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=CASCADE_HEADERS)
+            writer.writeheader()
+            for row in rows:
+                out = {h: row[h] for h in CASCADE_HEADERS if h not in ("seed_set", "experiment_result_row")}
+                out["seed_set"] = str(json.loads(row["seed_set"]))
+                out["experiment_result_row"] = run_rows[row["run_id"]]
+                out["additional_info"] = row["additional_info"] or ""
+                writer.writerow({k: "" if v is None else v for k, v in out.items()})
+        return len(rows)
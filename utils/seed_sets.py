@@ -0,0 +1,119 @@
+import csv
+import json
+import bisect
+import hashlib
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+class SeedSetEncoder:
+    """
+        Codifica delta dei seed set di una sweep, una riga alla volta.
+
+        Ogni checkpoint_interval righe (e alla prima riga) la colonna seed_set contiene la lista completa
+        ordinata, come nel formato classico; le altre righe contengono solo la differenza rispetto alla riga
+        precedente, come oggetto JSON {"+": [...], "-": [...]} (le chiavi vuote vengono omesse, quindi un seed
+        set invariato è "{}"). Se la differenza non è più corta della lista completa viene scritto un checkpoint.
+    """
+
+    def __init__(self, checkpoint_interval: int = 100):
+        self.checkpoint_interval = checkpoint_interval
+        self._previous: Optional[Set[int]] = None
+        self._since_checkpoint = 0
+
+    def encode(self, seed_set: Iterable[int]) -> str:
+        current = set(seed_set)
+        full = json.dumps(sorted(current))
+
+        checkpoint = self._previous is None or self._since_checkpoint + 1 >= self.checkpoint_interval
+        cell = full
+        if not checkpoint:
+            delta = {}
+            added = sorted(current - self._previous)
+            removed = sorted(self._previous - current)
+            if added:
+                delta["+"] = added
+            if removed:
+                delta["-"] = removed
+            cell = json.dumps(delta)
+            if len(cell) >= len(full):
+                cell, checkpoint = full, True
+
+        self._since_checkpoint = 0 if checkpoint else self._since_checkpoint + 1
+        self._previous = current
+        return cell
+
+
+def is_checkpoint(cell: str) -> bool:
+    return cell.lstrip().startswith("[")
+
+
+def _apply(seed_set: Set[int], cell: str) -> Set[int]:
+    delta = json.loads(cell)
+    return (seed_set - set(delta.get("-", []))) | set(delta.get("+", []))
+
+
+def decode_seed_sets(cells: Iterable[str]) -> Iterator[Set[int]]:
+    """Ricostruisce in sequenza i seed set di una colonna seed_set (liste complete, delta o un misto)."""
+    current: Set[int] = set()
+    for cell in cells:
+        current = set(json.loads(cell)) if is_checkpoint(cell) else _apply(current, cell)
+        yield current
+
+
+class SeedSetReader:
+    """
+        Accesso casuale ai seed set di un CSV di esperimenti, codificati o no con SeedSetEncoder.
+
+        La colonna seed_set viene letta una sola volta; reader[i] decodifica dal checkpoint più vicino
+        precedente alla riga i, quindi costa O(checkpoint_interval) delta.
+    """
+
+    def __init__(self, csv_path: str):
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            self.cells: List[str] = [row["seed_set"] for row in csv.DictReader(f)]
+        self.checkpoints = [i for i, cell in enumerate(self.cells) if is_checkpoint(cell)]
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __getitem__(self, i: int) -> Set[int]:
+        if i < 0 or i >= len(self.cells):
+            raise IndexError(f"Indice i={i} fuori dal range valido (0-{len(self.cells) - 1})")
+        k = bisect.bisect_right(self.checkpoints, i) - 1
+        if k < 0:
+            raise ValueError(f"Nessun checkpoint prima della riga {i}")
+        seed_set = set()
+        for seed_set in decode_seed_sets(self.cells[self.checkpoints[k]:i + 1]):
+            pass
+        return seed_set
+
+    def __iter__(self) -> Iterator[Set[int]]:
+        return decode_seed_sets(self.cells)
+
+
+def seed_set_hash(seed_set: Iterable[int]) -> str:
+    """Hash canonico di un seed set, indipendente dall'ordine e dai duplicati: blake2b della lista JSON ordinata."""
+    return hashlib.blake2b(json.dumps(sorted(set(seed_set))).encode(), digest_size=16).hexdigest()
+
+
+class SeedSetDeduplicator:
+    """
+        Riconosce i seed set già visti in una sequenza di righe (indici 0-based delle righe di dati del CSV,
+        gli stessi di SeedSetReader).
+
+        add() restituisce l'hash canonico del seed set e l'indice della riga in cui è comparso la prima
+        volta, oppure None se la riga è la prima occorrenza.
+    """
+
+    def __init__(self, seed_sets: Iterable[Iterable[int]] = ()):
+        self.first_row: Dict[str, int] = {}
+        self.num_rows = 0
+        for seed_set in seed_sets:
+            self.add(seed_set)
+
+    def add(self, seed_set: Iterable[int]) -> Tuple[str, Optional[int]]:
+        digest = seed_set_hash(seed_set)
+        row = self.num_rows
+        self.num_rows += 1
+        first = self.first_row.setdefault(digest, row)
+        return digest, first if first != row else None
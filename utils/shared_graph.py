@@ -0,0 +1,169 @@
+from multiprocessing import shared_memory
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import networkx as nx
+
+from utils.graph_arrays import CSRGraph
+
+# Segmenti agganciati da attach_shared_graph: restano aperti finché il processo worker è vivo
+_attached: List[shared_memory.SharedMemory] = []
+
+
+class SharedGraph:
+    """
+        Array di un CSRGraph (nodes, indptr, indices, degree) e vettori per nodo (threshold, costi, ...)
+        pubblicati una sola volta in memoria condivisa (multiprocessing.shared_memory).
+
+        Il processo che crea i segmenti ne è il proprietario: all'uscita dal context manager vengono
+        chiusi e rilasciati. handle è un piccolo dizionario picklabile (nome del segmento, dtype e shape di
+        ogni array) da passare ai worker, che con attach_shared_graph ottengono viste in sola lettura degli
+        stessi buffer: nessun pickling del grafo e nessuna copia per processo.
+
+        Uso:
+            with SharedGraph.from_networkx(G, ["threshold", "cost1"]) as shared:
+                with mp.Pool(processes, initializer=_init_worker, initargs=(shared.handle,)) as pool:
+                    ...
+
+            def _init_worker(handle):
+                csr, node_arrays = attach_shared_graph(handle)
+    """
+
+    def __init__(self, csr: CSRGraph, node_arrays: Optional[Dict[str, np.ndarray]] = None):
+        self.csr = csr
+        self.node_arrays = node_arrays or {}
+        self.handle: Optional[Dict[str, Tuple[str, str, Tuple[int, ...]]]] = None
+        self._shms: List[shared_memory.SharedMemory] = []
+
+    @classmethod
+    def from_networkx(cls, G: nx.Graph, attributes: Iterable[str] = ()) -> "SharedGraph":  # noqa
+        """CSR di G e, per ogni attributo in attributes, il vettore dei valori allineato a csr.nodes."""
+        csr = CSRGraph.from_networkx(G)
+        node_arrays = {}
+        for name in attributes:
+            values = nx.get_node_attributes(G, name)
+            dtype = np.int64 if all(isinstance(x, (int, np.integer)) for x in values.values()) else np.float64
+            node_arrays[name] = csr.node_array(values, dtype=dtype)
+        return cls(csr, node_arrays)
+
+    def __enter__(self) -> "SharedGraph":
+        self.publish()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
+
+    def publish(self) -> Dict[str, Tuple[str, str, Tuple[int, ...]]]:
+        arrays = {"nodes": self.csr.nodes, "indptr": self.csr.indptr, "indices": self.csr.indices,
+                  "degree": self.csr.degree}
+        arrays.update({f"node:{name}": array for name, array in self.node_arrays.items()})
+
+        self.handle = {}
+        for key, array in arrays.items():
+            shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+            self._shms.append(shm)
+            self.handle[key] = (shm.name, array.dtype.str, array.shape)
+        return self.handle
+
+    def release(self) -> None:
+        for shm in self._shms:
+            shm.close()
+            shm.unlink()
+        self._shms = []
+        self.handle = None
+
+
+def attach_shared_graph(handle: Dict[str, Tuple[str, str, Tuple[int, ...]]]) -> Tuple[CSRGraph, Dict[str, np.ndarray]]:
+    """
+        CSRGraph e vettori per nodo pubblicati da SharedGraph, come viste in sola lettura dei segmenti
+        condivisi (zero copie). Va chiamata una volta per processo, tipicamente nell'initializer del pool.
+    """
+    arrays = {}
+    for key, (name, dtype, shape) in handle.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _attached.append(shm)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        array.flags.writeable = False
+        arrays[key] = array
+
+    csr = CSRGraph(arrays["nodes"], arrays["indptr"], arrays["indices"], degree=arrays["degree"])
+    node_arrays = {key[len("node:"):]: array for key, array in arrays.items() if key.startswith("node:")}
+    return csr, node_arrays
+
+
+class _NodeAttributes:
+    """Attributi di un nodo letti direttamente dai vettori condivisi, senza costruire un dizionario."""
+
+    __slots__ = ("_arrays", "_i")
+
+    def __init__(self, arrays: Dict[str, np.ndarray], i: int):
+        self._arrays = arrays
+        self._i = i
+
+    def get(self, name: str, default: Any = None) -> Any:
+        array = self._arrays.get(name)
+        return default if array is None else array[self._i].item()
+
+    def __getitem__(self, name: str) -> Any:
+        return self._arrays[name][self._i].item()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._arrays
+
+
+class _NodeView:
+    def __init__(self, view: "SharedGraphView"):
+        self._view = view
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._view.node_ids)
+
+    def __len__(self) -> int:
+        return len(self._view.node_ids)
+
+    def __contains__(self, v: Hashable) -> bool:
+        return v in self._view.positions
+
+    def __getitem__(self, v: Hashable) -> _NodeAttributes:
+        return _NodeAttributes(self._view.node_arrays, self._view.positions[v])
+
+
+class SharedGraphView:
+    """
+        Vista in sola lettura di un grafo agganciato con attach_shared_graph, con il sottoinsieme dell'API di
+        nx.Graph usato dagli algoritmi greedy (nodes, nodes[v][attr], neighbors, degree, number_of_nodes):
+        permette di eseguire cost_seeds_greedy nei worker sugli array condivisi, senza ricostruire un nx.Graph.
+
+        I vicini vengono restituiti in ordine di id (CSR), non nell'ordine di inserimento di networkx.
+    """
+
+    def __init__(self, csr: CSRGraph, node_arrays: Optional[Dict[str, np.ndarray]] = None):
+        self.csr = csr
+        self.node_arrays = node_arrays or {}
+        self.node_ids: List[Hashable] = csr.nodes.tolist()
+        self.positions: Dict[Hashable, int] = {v: i for i, v in enumerate(self.node_ids)}
+        self.nodes = _NodeView(self)
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.node_ids)
+
+    def __contains__(self, v: Hashable) -> bool:
+        return v in self.positions
+
+    def number_of_nodes(self) -> int:
+        return len(self.node_ids)
+
+    def number_of_edges(self) -> int:
+        return self.csr.num_edges
+
+    def neighbors(self, v: Hashable) -> List[Hashable]:
+        return self.csr.nodes[self.csr.neighbors(self.positions[v])].tolist()
+
+    def degree(self, v: Optional[Hashable] = None):
+        if v is not None:
+            return int(self.csr.degree[self.positions[v]])
+        return list(zip(self.node_ids, self.csr.degree.tolist()))
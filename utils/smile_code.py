@@ -0,0 +1,162 @@
+import json
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import networkx as nx
+
+
+def load_betweenness(centrality_file: str) -> Dict[int, float]:
+    """Carica la betweenness centrality salvata su disco (nodo -> valore)."""
+    with open(centrality_file, "r") as f:
+        return {int(k): float(v) for k, v in json.load(f).items()}
+
+
+def _suffix_min(costs: List[float]) -> List[float]:
+    """suffix[i] = costo minimo tra costs[i:]; suffix[len] = inf."""
+    suffix = [float("inf")] * (len(costs) + 1)
+    for i in range(len(costs) - 1, -1, -1):
+        suffix[i] = min(costs[i], suffix[i + 1])
+    return suffix
+
+
+class SelectionContext:
+    """
+        Stato precalcolato di SMiLe-CoDe per un grafo, una partizione e una funzione di costo.
+
+        Contiene, una volta per tutte, i nodi di ogni comunità ordinati per betweenness decrescente con i
+        relativi costi, l'ordine globale (betweenness crescente) e, per la variante bridges, l'ordine dei
+        nodi dei local bridge. Ogni array ha anche il minimo dei costi sui suffissi, che permette di
+        interrompere la scansione appena nessun nodo successivo può rientrare nel budget residuo.
+
+        query(budget) restituisce gli stessi seed (nello stesso ordine) di SMiLe_CoDe senza rileggere file,
+        impostare attributi o riordinare nodi.
+    """
+
+    def __init__(self, G: nx.Graph, cost_attr: str, partition: Dict[int, int],  # noqa
+                 betweenness: Optional[Dict[int, float]] = None,
+                 local_bridges: Optional[Iterable[Tuple]] = None):
+        if betweenness is None:
+            betweenness = nx.get_node_attributes(G, "betweenness")
+        cost = {v: G.nodes[v].get(cost_attr, float("inf")) for v in G.nodes()}
+
+        self.cost_attr = cost_attr
+        self.num_nodes = G.number_of_nodes()
+
+        # Comunità nell'ordine di prima apparizione nella partizione (come in SMiLe_CoDe)
+        communities: Dict[int, List[int]] = {}
+        for node, comm_id in partition.items():
+            communities.setdefault(comm_id, []).append(node)
+
+        self.communities = []
+        for comm_id, nodes in communities.items():
+            ordered = sorted(nodes, key=lambda v: betweenness.get(v, -float("inf")), reverse=True)
+            costs = [cost[v] for v in ordered]
+            self.communities.append((comm_id, len(nodes), ordered, costs, _suffix_min(costs)))
+
+        self.global_order = sorted(G.nodes(), key=lambda v: betweenness.get(v, float("inf")))
+        self.global_costs = [cost[v] for v in self.global_order]
+        self.global_suffix_min = _suffix_min(self.global_costs)
+
+        self.bridge_order = None
+        if local_bridges is not None:
+            bridge_nodes = set()
+            for t in set(local_bridges):
+                n1, n2 = t[0], t[1]
+                b1 = betweenness.get(n1, float("inf"))
+                b2 = betweenness.get(n2, float("inf"))
+                bridge_nodes.add(n1 if b1 >= b2 else n2)
+            self.bridge_order = sorted(bridge_nodes, key=lambda v: betweenness.get(v, float("inf")))
+            self.bridge_costs = [cost[v] for v in self.bridge_order]
+            self.bridge_suffix_min = _suffix_min(self.bridge_costs)
+
+    @staticmethod
+    def _scan(order: List[int], costs: List[float], suffix_min: List[float], budget: float,
+              seeds: List[int], exclude: Optional[set] = None, check_sum: bool = False, start: int = 0,
+              spent: float = 0) -> float:
+        """
+            Scansione greedy 'salta ciò che non entra' di order[start:], partendo da una spesa iniziale spent;
+            restituisce la spesa totale. check_sum replica il doppio controllo della fase locale di SMiLe_CoDe
+            (rilevante solo con costi float).
+        """
+        for i in range(start, len(order)):
+            node = order[i]
+            if budget - spent < suffix_min[i]:
+                break
+            if exclude is not None and node in exclude:
+                continue
+            if costs[i] <= budget - spent and (not check_sum or costs[i] + spent <= budget):
+                seeds.append(node)
+                spent += costs[i]
+                if exclude is not None:
+                    exclude.add(node)
+            if spent >= budget:
+                break
+        return spent
+
+    def local_budgets(self, total_budget: float) -> List[int]:
+        """Budget proporzionale alla dimensione di ogni comunità (stesso ordine di self.communities)."""
+        return [int(total_budget * size / self.num_nodes) for _, size, _, _, _ in self.communities]
+
+    def query(self, total_budget: float) -> List[int]:
+        """Seed set di SMiLe-CoDe (o SMiLe-CoDe-bridges, se il contesto ha i local bridge) per il budget dato."""
+        seeds: List[int] = []
+        remaining_budget = total_budget
+
+        for (_, _, ordered, costs, suffix_min), comm_budget in zip(self.communities,
+                                                                   self.local_budgets(total_budget)):
+            local_budget = min(comm_budget, remaining_budget)
+            if local_budget <= 0:
+                continue
+            remaining_budget -= self._scan(ordered, costs, suffix_min, local_budget, seeds, check_sum=True)
+
+        return self.global_phase(seeds, remaining_budget)
+
+    def global_phase(self, seeds: List[int], remaining_budget: float) -> List[int]:
+        """Esaurisce il budget residuo (prima sui local bridge, se presenti, poi su tutti i nodi)."""
+        if remaining_budget <= 0:
+            return seeds
+
+        if self.bridge_order is not None:
+            # Come in SMiLe-CoDe-bridges, i nodi dei bridge non vengono confrontati con i seed già scelti
+            remaining_budget -= self._scan(self.bridge_order, self.bridge_costs, self.bridge_suffix_min,
+                                           remaining_budget, seeds)
+            if remaining_budget <= 0:
+                return seeds
+
+        self._scan(self.global_order, self.global_costs, self.global_suffix_min, remaining_budget, seeds,
+                   exclude=set(seeds))
+        return seeds
+
+    def sweep(self, budgets: Sequence[float]) -> List[List[int]]:
+        """
+            Seed set per ogni budget di budgets (stesso ordine), equivalente a [query(b) for b in budgets].
+
+            Per ogni comunità il prefisso dell'ordine per betweenness che rientra nel budget locale viene
+            trovato per tutti i budget insieme con una ricerca sui costi cumulativi; la scansione nodo per
+            nodo riparte solo dal primo nodo saltato, e solo se dopo di esso qualche nodo può ancora entrare.
+        """
+        totals = np.asarray(budgets, dtype=np.float64)
+        all_seeds: List[List[int]] = [[] for _ in range(len(totals))]
+        remaining = list(budgets)
+
+        for _, size, ordered, costs, suffix_min in self.communities:
+            cumulative = np.cumsum(costs)
+            local = (totals * size / self.num_nodes).astype(np.int64)
+            # Il prefisso si ferma al primo nodo non acquistabile o appena la spesa raggiunge il budget locale
+            prefix = np.minimum(np.searchsorted(cumulative, local, side="right"),
+                                np.searchsorted(cumulative, local, side="left") + 1)
+
+            for i, (local_budget, p) in enumerate(zip(local.tolist(), prefix.tolist())):
+                local_budget = min(local_budget, remaining[i])
+                if local_budget <= 0:
+                    continue
+                seeds = all_seeds[i]
+                seeds.extend(ordered[:p])
+                spent = cumulative[p - 1].item() if p > 0 else 0
+                if p < len(ordered) and spent < local_budget:
+                    # Il nodo p viene saltato: scansione dal successivo con il budget locale residuo
+                    spent = self._scan(ordered, costs, suffix_min, local_budget, seeds,
+                                       check_sum=True, start=p + 1, spent=spent)
+                remaining[i] -= spent
+
+        return [self.global_phase(seeds, rem) for seeds, rem in zip(all_seeds, remaining)]
@@ -3,9 +3,16 @@ import csv
 import json
 import math
 import random
+import threading
+from datetime import datetime
 from tqdm import tqdm
 import networkx as nx
-from typing import Dict, Set, Optional, Any
+from typing import Dict, Iterable, List, Set, Optional, Any
+
+import numpy as np
+
+from utils.seed_sets import SeedSetDeduplicator, SeedSetEncoder, SeedSetReader
+from utils.graph_arrays import CSRGraph
 
 # Percorso del file di salvataggio centralità
 CENTRALITY_FILE = "./facebook_betweenness.json"
@@ -74,79 +81,121 @@ def assign_cost_attributes(G: nx.Graph, use_threshold: bool):  # noqa
         return G, cost1, cost2, cost3
 
 
+def assign_cost_arrays(csr: CSRGraph, order: np.ndarray):
+    """
+        Come assign_cost_attributes(G, use_threshold=True), ma su un CSRGraph e senza costruire il grafo
+        networkx: i costi sono array allineati a csr.nodes. order sono le posizioni dei nodi nell'ordine di
+        G.nodes() (CSRGraph.from_edgelist(path, return_order=True)); cost2 viene estratto in quell'ordine,
+        quindi i valori coincidono con quelli di assign_cost_attributes.
+        La centralità per cost3 deve essere già salvata in CENTRALITY_FILE: calcolarla richiede networkx.
 
-def log_experiment(csv_path: str, algorithm_name: str, cost_function: str, use_threshold: bool, budget: int,
-                   seed_set: Set[int], total_cost: int, execution_time: float, G: Optional[nx.Graph] = None,  # noqa
-                   additional_info: Optional[Dict[str, Any]] = None) -> None:
+        Returns:
+            cost1, cost2, cost3, threshold
+    """
+    cost1 = (csr.degree.astype(np.int64) + 1) // 2
 
-    headers = [
-        "timestamp",
-        "algorithm_name",
-        "cost_function",
-        "use_threshold",
-        "budget",
-        "num_nodes",
-        "num_edges",
-        "seed_set",
-        "num_seeds",
-        "total_cost",
-        "execution_time",
-        "additional_info"
-    ]
+    random_min_range = int(cost1.min())
+    random_max_range = int(cost1.max())
 
-    is_new_file = not os.path.exists(csv_path)
-    mode = "a" if not is_new_file else "w"
+    random.seed(42)
+    cost2 = np.empty(csr.num_nodes, dtype=np.int64)
+    cost2[order] = [random.randint(random_min_range, random_max_range) for _ in range(csr.num_nodes)]
+
+    if not os.path.exists(CENTRALITY_FILE):
+        raise FileNotFoundError(f"{CENTRALITY_FILE} non trovato: la centralità va calcolata con networkx "
+                                f"(assign_cost_attributes) prima di usare gli array CSR")
+    print("Loading centrality from file...")
+    with open(CENTRALITY_FILE, "r") as f:
+        centrality = {int(k): float(v) for k, v in json.load(f).items()}
+    epsilon = 1e-6
+
+    log_centrality = np.array([math.log10(centrality[v] + epsilon) for v in csr.nodes.tolist()])
+    shifted_log_centrality = log_centrality - log_centrality.min()
+    max_shifted = shifted_log_centrality.max()
+    scale = random_max_range / max_shifted if max_shifted > 0 else 1.0
+    cost3 = shifted_log_centrality * scale
+
+    return cost1, cost2, cost3, cost1.copy()
+
+
+# Schema dei CSV degli esperimenti e delle cascate
+EXPERIMENT_HEADERS = [
+    "timestamp",
+    "algorithm_name",
+    "cost_function",
+    "use_threshold",
+    "budget",
+    "num_nodes",
+    "num_edges",
+    "seed_set",
+    "num_seeds",
+    "total_cost",
+    "execution_time",
+    "additional_info"
+]
+
+CASCADE_HEADERS = [
+    "timestamp",
+    "algorithm_name",
+    "seed_set",
+    "seed_size",
+    "final_influence",
+    "final_influence_size",
+    "num_nodes",
+    "num_edges",
+    "experiment_result_row",
+    "execution_time",
+    "round",
+    "additional_info"
+]
 
-    row = {
-        "timestamp": __import__("datetime").datetime.now().isoformat(),
+
+def experiment_row(algorithm_name: str, cost_function: str, use_threshold: bool, budget: int,
+                   seed_set: Iterable[int], total_cost: int, execution_time: float,
+                   G: Optional[nx.Graph] = None,  # noqa
+                   additional_info: Optional[Dict[str, Any]] = None,
+                   encoder: Optional[SeedSetEncoder] = None,
+                   dedup: Optional[SeedSetDeduplicator] = None) -> Dict[str, Any]:
+    """
+        Riga del CSV degli esperimenti (schema EXPERIMENT_HEADERS). Con encoder la colonna seed_set
+        contiene la codifica delta rispetto alla riga precedente (vedi utils.seed_sets). Con dedup
+        additional_info riporta l'hash canonico del seed set ("seed_set_hash") e, se lo stesso seed set
+        compare in una riga precedente, il numero 1-based di quella riga di dati ("duplicate_of", come
+        experiment_result_row nei log delle cascate).
+    """
+    seeds = sorted(seed_set)
+    if dedup is not None:
+        digest, first_row = dedup.add(seeds)
+        additional_info = dict(additional_info or {}, seed_set_hash=digest)
+        if first_row is not None:
+            additional_info["duplicate_of"] = first_row + 1
+    return {
+        "timestamp": datetime.now().isoformat(),
         "algorithm_name": algorithm_name,
         "cost_function": cost_function,
         "use_threshold": use_threshold,
         "budget": budget,
         "num_nodes": G.number_of_nodes() if G is not None else "",
         "num_edges": G.number_of_edges() if G is not None else "",
-        "seed_set": json.dumps(sorted(seed_set)),
-        "num_seeds": len(seed_set),
+        "seed_set": encoder.encode(seeds) if encoder is not None else json.dumps(seeds),
+        "num_seeds": len(seeds),
         "total_cost": total_cost,
         "execution_time": execution_time,
         "additional_info": json.dumps(additional_info) if additional_info else ""
     }
 
-    with open(csv_path, mode, newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=headers)
-        if is_new_file:
-            writer.writeheader()
-        writer.writerow(row)
-
 
-def log_cascade(csv_path: str, algorithm_name: str, seed_set_str: str, seed_size: int, final_influence_size: int,
-                final_influence: Set[int], execution_time: float, experiment_result_row: int, round: int,  # noqa
-                G: Optional[nx.Graph] = None, additional_info: Optional[Dict[str, Any]] = None) -> None:  # noqa
-
-    headers = [
-        "timestamp",
-        "algorithm_name",
-        "seed_set",
-        "seed_size",
-        "final_influence",
-        "final_influence_size",
-        "num_nodes",
-        "num_edges",
-        "experiment_result_row",
-        "execution_time",
-        "round",
-        "additional_info"
-    ]
-
-    is_new_file = not os.path.exists(csv_path)
-    mode = "a" if not is_new_file else "w"
-
-    row = {
-        "timestamp": __import__("datetime").datetime.now().isoformat(),
+def cascade_row(algorithm_name: str, seed_set_str: str, seed_size: int, final_influence_size: int,
+                final_influence: Iterable[int], execution_time: float, experiment_result_row: int, round: int,  # noqa
+                G: Optional[nx.Graph] = None,  # noqa
+                additional_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Riga del CSV delle cascate (schema CASCADE_HEADERS)."""
+    return {
+        "timestamp": datetime.now().isoformat(),
         "algorithm_name": algorithm_name,
         "seed_set": seed_set_str,
         "seed_size": seed_size,
-        "final_influence":  json.dumps(sorted(final_influence)),
+        "final_influence": json.dumps(sorted(final_influence)),
         "final_influence_size": final_influence_size,
         "num_nodes": G.number_of_nodes() if G is not None else "",
         "num_edges": G.number_of_edges() if G is not None else "",
@@ -156,8 +205,128 @@ def log_cascade(csv_path: str, algorithm_name: str, seed_set_str: str, seed_size
         "additional_info": json.dumps(additional_info) if additional_info else ""
     }
 
+
+def _append_rows(csv_path: str, headers: List[str], rows: List[Dict[str, Any]]) -> None:
+    is_new_file = not os.path.exists(csv_path)
+    mode = "a" if not is_new_file else "w"
+
     with open(csv_path, mode, newline="", encoding="utf-8") as csvfile:
         writer = csv.DictWriter(csvfile, fieldnames=headers)
         if is_new_file:
             writer.writeheader()
-        writer.writerow(row)
+        writer.writerows(rows)
+
+
+def log_experiment(csv_path: str, algorithm_name: str, cost_function: str, use_threshold: bool, budget: int,
+                   seed_set: Set[int], total_cost: int, execution_time: float, G: Optional[nx.Graph] = None,  # noqa
+                   additional_info: Optional[Dict[str, Any]] = None) -> None:
+    row = experiment_row(algorithm_name, cost_function, use_threshold, budget, seed_set, total_cost,
+                         execution_time, G, additional_info)
+    _append_rows(csv_path, EXPERIMENT_HEADERS, [row])
+
+
+def log_cascade(csv_path: str, algorithm_name: str, seed_set_str: str, seed_size: int, final_influence_size: int,
+                final_influence: Set[int], execution_time: float, experiment_result_row: int, round: int,  # noqa
+                G: Optional[nx.Graph] = None, additional_info: Optional[Dict[str, Any]] = None) -> None:  # noqa
+    row = cascade_row(algorithm_name, seed_set_str, seed_size, final_influence_size, final_influence,
+                      execution_time, experiment_result_row, round, G, additional_info)
+    _append_rows(csv_path, CASCADE_HEADERS, [row])
+
+
+class ExperimentLogger:
+    """
+        Logger CSV bufferizzato, con lo stesso schema di log_experiment / log_cascade.
+
+        Il file resta aperto per tutta la durata del logger e le righe vengono scritte a blocchi di
+        batch_size; con flush_interval (secondi) un thread in background svuota il buffer anche se il blocco
+        non è pieno. All'uscita dal context manager le righe rimaste vengono scritte e il file chiuso.
+        Con checkpoint_interval i seed set vengono scritti come delta rispetto alla riga precedente, con una
+        lista completa ogni checkpoint_interval righe (vedi utils.seed_sets.SeedSetReader per rileggerli).
+        Con dedup ogni riga degli esperimenti riporta l'hash canonico del seed set e le righe con un seed set
+        già loggato puntano alla prima occorrenza (vedi experiment_row); se il CSV esiste già, i seed set
+        presenti vengono riletti all'apertura, così i riferimenti restano validi anche in append. La rilettura
+        costa una scansione dell'intero CSV, quindi dedup va richiesto esplicitamente.
+
+        Uso:
+            with ExperimentLogger("./logs/cost1_CSG.csv") as logger:
+                logger.log_experiment(algorithm_name, cost_function, ...)
+    """
+
+    def __init__(self, csv_path: str, headers: Optional[List[str]] = None, batch_size: int = 100,
+                 flush_interval: Optional[float] = None, checkpoint_interval: Optional[int] = None,
+                 dedup: bool = False):
+        self.csv_path = csv_path
+        self.headers = headers or EXPERIMENT_HEADERS
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._file = None
+        self._writer = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._encoder = SeedSetEncoder(checkpoint_interval) if checkpoint_interval else None
+        self.dedup = dedup
+        self._dedup: Optional[SeedSetDeduplicator] = None
+
+    def __enter__(self) -> "ExperimentLogger":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def open(self) -> None:
+        is_new_file = not os.path.exists(self.csv_path) or os.path.getsize(self.csv_path) == 0
+        if self.dedup and self.headers == EXPERIMENT_HEADERS:
+            self._dedup = SeedSetDeduplicator(SeedSetReader(self.csv_path) if not is_new_file else ())
+        self._file = open(self.csv_path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.headers)
+        if is_new_file:
+            self._writer.writeheader()
+
+        if self.flush_interval:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._flush_periodically, daemon=True)
+            self._thread.start()
+
+    def _flush_periodically(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def write_row(self, row: Dict[str, Any]) -> None:
+        if self._file is None:
+            raise RuntimeError("ExperimentLogger va aperto (open() o context manager) prima di scrivere")
+        with self._lock:
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def log_experiment(self, *args, **kwargs) -> None:
+        """Stessi argomenti di log_experiment, senza csv_path."""
+        self.write_row(experiment_row(*args, encoder=self._encoder, dedup=self._dedup, **kwargs))
+
+    def log_cascade(self, *args, **kwargs) -> None:
+        """Stessi argomenti di log_cascade, senza csv_path."""
+        self.write_row(cascade_row(*args, **kwargs))
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is None or not self._buffer:
+                return
+            self._writer.writerows(self._buffer)
+            self._buffer = []
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                self._writer = None